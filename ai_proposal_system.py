@@ -2,95 +2,472 @@
 Enhanced LangChain-based Multi-Agent AI Use Case Generation System
 With strict validation, consolidated output, and comprehensive documentation
 """
-import os
-import json
+import re
+import queue
+import asyncio
 import logging
+import threading
+import concurrent.futures
+from functools import lru_cache
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Dict, Any, List
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain.tools import Tool
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
+from typing import Dict, Any, List, Optional, Callable, Tuple, Union, Iterator, AsyncIterator, TYPE_CHECKING
+import orjson
 
 from config.settings import settings
-from tools.web_search_tool import WebSearchTool
-from tools.kaggle_tool import KaggleTool
-from tools.github_tool import GitHubTool
 from utils.error_handling import (
     SystemError, APIError, ValidationError, ConfigurationError,
     handle_api_errors, validate_company_input, validate_industry_input,
     log_system_event, create_error_report, retry_on_failure,
     check_system_health, create_fallback_response
 )
-from utils.excel_generator import ExcelReportGenerator
 
-# Configure logging
-logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+# LangChain, the HTTP client, the tools and the Excel generator are imported where first
+# used, so importing this module (e.g. on a Streamlit rerun) stays cheap
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable
+    from langchain_openai import ChatOpenAI
+
+# Logging is configured by the entry point (main() or the Streamlit app), not on import
 logger = logging.getLogger(__name__)
 
+
+# System prompts are static (byte-identical across runs) so provider prefix caching can hit;
+# company, industry and upstream outputs only appear in the human turn templates below
+RESEARCH_PROMPT = """
+        You are a Senior Market Research Analyst. Conduct comprehensive market research for the company and sector given in the request.
+        
+        RESEARCH REQUIREMENTS:
+        1. Base the analysis on the recent reports and industry analyses in the provided web search results
+        2. Focus on authoritative sources: McKinsey, Deloitte, PwC, BCG, company reports
+        
+        OUTPUT FORMAT:
+        Provide a comprehensive research report with:
+        - Executive Summary (2-3 paragraphs)
+        - Industry analysis and trends
+        - Competitive landscape
+        - Market opportunities
+        - Strategic recommendations
+        
+        Include specific data points, statistics, and quantitative insights with source citations.
+        """
+
+RESEARCH_INPUT = """COMPANY: {company}
+INDUSTRY: {industry}
+
+WEB SEARCH RESULTS:
+{search_results}
+
+{input}"""
+
+USE_CASE_PROMPT = """
+        You are an AI/ML Industry Specialist and Use Case Strategist. Generate EXACTLY 15-20 detailed AI use cases for the company and industry given in the request.
+        
+        CRITICAL REQUIREMENTS - MUST BE FOLLOWED EXACTLY:
+        - Generate EXACTLY 15-20 detailed AI use cases (no more, no less)
+        - Distribute EXACTLY across these 5 categories:
+          * Generative AI & LLMs: 4-5 use cases (include keywords: generative ai, llm, chatbot, content generation)
+          * Computer Vision: 4-5 use cases (include keywords: computer vision, image recognition, visual inspection)
+          * Predictive Analytics & ML: 4-5 use cases (include keywords: predictive analytics, forecasting, machine learning)
+          * Natural Language Processing: 2-3 use cases (include keywords: nlp, text analysis, sentiment analysis)
+          * Automation & Optimization: 2-3 use cases (include keywords: automation, optimization, process automation)
+        
+        Each use case MUST include:
+        - Description
+        - ROI estimate
+        - Implementation complexity
+        - Cross-functional impact
+        - Business value
+        
+        The request includes a summary of the research findings; call get_artifact with
+        "research_findings" for the full report.
+        
+        Use the web_search tool to find current AI use cases and industry benchmarks. Emit all
+        independent web_search calls in a single assistant message (parallel tool calls).
+        """
+
+USE_CASE_INPUT = """COMPANY: {company}
+INDUSTRY: {industry}
+
+RESEARCH FINDINGS (summary):
+{research_summary}
+
+{input}"""
+
+# {resource_kind} and {tool_name} are fixed per resource agent and filled when it is built
+RESOURCE_PROMPT = """
+        You are an AI/ML Resource Collection Specialist. Collect relevant {resource_kind} for the company and industry given in the request.
+        
+        REQUIREMENTS:
+        1. Use the {tool_name} tool to find relevant {resource_kind}; emit several independent
+           {tool_name} calls (different angles on the industry's use cases) in a single
+           assistant message so they run in parallel
+        2. Focus on industry-specific and company-relevant resources
+        3. Include at least 3-5 {resource_kind} with clickable links
+        4. Provide quality assessments for each resource
+        
+        OUTPUT FORMAT:
+        - {resource_kind} with direct links and quality assessments
+        - Implementation recommendations
+        """
+
+RESOURCE_INPUT = """COMPANY: {company}
+INDUSTRY: {industry}
+
+{input}"""
+
+PROPOSAL_PROMPT = """
+        You are a Senior Business Strategy Consultant and Proposal Writer. Create a comprehensive business proposal for the company and industry given in the request, from the research, use cases and resources it provides.
+        
+        PROPOSAL REQUIREMENTS:
+        1. Executive Summary
+        2. Business Case
+        3. AI Use Cases (MANDATORY: Include the complete use case analysis provided)
+        4. Implementation Roadmap
+        5. Budget and ROI
+        6. Resource Assets & Implementation Support (MANDATORY: Include clickable links)
+        7. Risk Management
+        8. Next Steps
+        
+        CRITICAL: Section 3 (AI Use Cases) MUST include the complete 15-20 detailed use cases provided.
+        CRITICAL: Include all clickable links to datasets and repositories.
+        """
+
+PROPOSAL_INPUT = """COMPANY: {company}
+INDUSTRY: {industry}
+
+RESEARCH FINDINGS (summary):
+{research_summary}
+
+USE CASES:
+{use_cases}
+
+RESOURCES:
+{resources}
+
+{input}"""
+
+# Single-pass mode: one agent plans, dispatches every search in parallel and writes the proposal
+CONSULTANT_PROMPT = """
+        You are a Senior AI Strategy Consultant. Produce a complete AI use case proposal for the company and industry given in the request.
+        
+        PLAN:
+        1. Search market intelligence with web_search (industry AI trends, company strategy, competitors)
+        2. Search datasets with kaggle_search and repositories with github_search
+        3. Compose the proposal
+        Emit all searches from steps 1 and 2 in a single assistant message so they run in parallel,
+        then write the proposal from the results without further tool calls.
+        
+        PROPOSAL REQUIREMENTS:
+        1. Executive Summary
+        2. Business Case (industry analysis, competitive landscape, market opportunities)
+        3. AI Use Cases: EXACTLY 15-20 use cases across Generative AI & LLMs (4-5), Computer Vision (4-5),
+           Predictive Analytics & ML (4-5), Natural Language Processing (2-3) and Automation & Optimization (2-3),
+           each with description, ROI estimate, implementation complexity and business value
+        4. Implementation Roadmap
+        5. Budget and ROI
+        6. Resource Assets & Implementation Support (MANDATORY: Kaggle datasets and GitHub repositories with clickable links)
+        7. Risk Management
+        8. Next Steps
+        
+        Include specific data points and statistics with source citations.
+        """
+
+CONSULTANT_INPUT = """COMPANY: {company}
+INDUSTRY: {industry}
+
+{input}"""
+
+# Searches run up front for the research stage, so it needs a single LLM call and no agent loop
+RESEARCH_QUERIES = [
+    "{industry} AI adoption trends 2025",
+    "{company} annual report AI strategy",
+    "{industry} market research McKinsey Deloitte",
+    "{company} competitive analysis technology sector"
+]
+
+ARTIFACT_SUMMARY_PROMPT = """
+        Extract the key trends, competitors and opportunities from the following {artifact_name}
+        for downstream analysts, at most 5 short items each (about 500 tokens in total).
+        Keep concrete figures, names and categories; drop narrative and formatting.
+        """
+
+RESOURCE_KINDS = {
+    "kaggle_search": "Kaggle datasets",
+    "github_search": "GitHub repositories"
+}
+
+
+# Static sections of the consolidated report, built once at import
+REPORT_METHODOLOGY = """## 2. Methodology
+
+### Multi-Agent Research Architecture
+Our AI use case generation employs a sophisticated 4-agent system:
+
+#### Research Agent
+- Comprehensive market and industry analysis
+- Authoritative source research (McKinsey, Deloitte, PwC, BCG)
+- Competitive landscape assessment
+
+#### Use Case Generation Agent
+- Generate 15-20 detailed AI use cases
+- Strict category distribution validation
+- ROI and complexity analysis
+
+#### Resource Collection Agent
+- Identify implementation resources
+- Curate Kaggle datasets and GitHub repositories
+- Quality assessment and relevance scoring
+
+#### Proposal Generation Agent
+- Consolidate findings into business proposal
+- Professional formatting and structure
+- Actionable implementation roadmap"""
+
+REPORT_ROADMAP = """## 6. Implementation Roadmap
+
+### Phase 1: Foundation (Months 1-3)
+- Infrastructure setup and team formation
+- Data pipeline development
+- Pilot use case selection and development
+
+### Phase 2: Core Implementation (Months 4-9)
+- Primary use cases implementation
+- System integration and testing
+- Performance monitoring and optimization
+
+### Phase 3: Scale and Enhancement (Months 10-12)
+- Remaining use cases deployment
+- Advanced analytics and monitoring
+- Continuous improvement processes"""
+
+REPORT_BUDGET_ROI = """## 7. Budget and ROI Analysis
+
+### Investment Categories
+- **Technology Infrastructure (35-40%)**: Cloud resources, AI platforms, development tools
+- **Human Resources (40-45%)**: AI engineers, project managers, training
+- **Data and Licensing (10-15%)**: Dataset acquisition, API services, software licenses
+- **Operations and Maintenance (5-10%)**: Monitoring, updates, support
+
+### ROI Projections
+- **Year 1**: Infrastructure investment, initial cost savings
+- **Year 2**: Operational efficiency gains, process optimization  
+- **Year 3**: Revenue enhancement, competitive advantage
+- **3-Year Total**: Projected 300-500% ROI based on industry benchmarks"""
+
+REPORT_RISK = """## 8. Risk Management
+
+### Key Risks and Mitigation Strategies
+- **Technical Risks**: Model performance, data quality, integration challenges
+- **Business Risks**: User adoption, ROI realization, competitive response
+- **Operational Risks**: Talent availability, technology evolution, budget management
+
+### Mitigation Approaches
+Each risk includes specific mitigation strategies, contingency plans, and monitoring frameworks."""
+
+REPORT_NEXT_STEPS = """## 9. Next Steps
+
+### Immediate Actions (Week 1-2)
+1. Executive review and budget approval
+2. Core team assembly and vendor selection
+3. Project charter development
+
+### Foundation Phase (Month 1-3)  
+1. Infrastructure deployment
+2. Data integration and quality processes
+3. Pilot use case development
+
+### Success Metrics
+- Use case implementation completion rate
+- Performance against ROI projections
+- User adoption and satisfaction scores"""
+
+REPORT_REFERENCES = """## 11. References
+
+### Sources
+- McKinsey Global Institute AI reports and analyses
+- Deloitte Technology Trends and Digital Transformation studies
+- PwC AI and Automation industry benchmarks  
+- Boston Consulting Group AI implementation case studies
+- Kaggle datasets and GitHub implementation repositories
+
+---
+
+*This report was generated using an advanced multi-agent AI research system designed to provide comprehensive, actionable intelligence for AI implementation strategy.*"""
+
+
+@lru_cache(maxsize=1)
+def _configure_llm_cache() -> None:
+    """Install a process-wide LLM response cache (once) so repeated prompts skip the API round trip"""
+    from langchain_core.globals import set_llm_cache
+    
+    if settings.REDIS_URL:
+        # Shared cache for multi-process / Streamlit Cloud deployments
+        import redis
+        from langchain_community.cache import RedisCache
+        set_llm_cache(RedisCache(redis_=redis.Redis.from_url(settings.REDIS_URL)))
+    else:
+        from langchain_community.cache import SQLiteCache
+        set_llm_cache(SQLiteCache(database_path=str(settings.REPORTS_DIR / ".langchain_cache.db")))
+
+
+# Per-run state (tool cache, artifacts). Each proposal runs in its own
+# asyncio task, so concurrent proposals on one system never see each other's state
+_current_run: ContextVar[Dict[str, Any]] = ContextVar("proposal_run")
+
+
 class SimpleLangChainSystem:
     """
     Enhanced LangChain-based Multi-Agent AI Use Case Generation System
     With strict validation, consolidated output, and comprehensive documentation
     """
     
+    # Successful proposals kept in memory for repeated requests
+    PROPOSAL_MEMO_SIZE = 128
+    
+    # Requests each search tool may have in flight at once across all runs, so batch runs
+    # stay under the search APIs' rate limits
+    TOOL_CONCURRENCY = 10
+    
+    # Lowercase needles checked by _validate_proposal_output, mapped to the elements they satisfy
+    _VALIDATION_NEEDLES = {
+        "executive summary": ("executive summary",),
+        "use case": ("ai use cases",),
+        "ai": ("ai use cases",),
+        "budget": ("budget",),
+        "cost": ("budget",),
+        "investment": ("budget",),
+        "return on investment": ("roi", "budget"),
+        "roi": ("roi",),
+        "implementation": ("implementation",),
+        "roadmap": ("implementation",),
+        "risk": ("risk",),
+        "kaggle.com": ("kaggle.com",),
+        "github.com": ("github.com",),
+        "http": ("http",),
+        "1.": (),
+        "2.": (),
+        "3.": ()
+    }
+    # Longest needles first so overlapping alternatives resolve to the most specific match
+    _VALIDATION_PATTERN = re.compile("|".join(
+        re.escape(needle) for needle in sorted(_VALIDATION_NEEDLES, key=len, reverse=True)
+    ))
+    
     def __init__(self):
         """Initialize the Enhanced LangChain Multi-Agent System"""
+        import httpx
+        from langchain_core.tools import StructuredTool
+        from tools.web_search_tool import WebSearchTool
+        from tools.kaggle_tool import KaggleTool
+        from tools.github_tool import GitHubTool
+        
         try:
             # Validate system health
             check_system_health()
             self._validate_api_connectivity()
+            _configure_llm_cache()
             
-            # Initialize LLM with enhanced error handling
-            self.llm = self._initialize_llm()
+            # Initialize LLMs with enhanced error handling: a cheap tier for research and
+            # resource collection, a stronger tier for use cases and the final proposal
+            self.llm_fast = self._initialize_llm(settings.LLM_MODEL_FAST)
+            self.llm_smart = self._initialize_llm(settings.LLM_MODEL_SMART)
+            # The same models (and clients) with the global LLM cache off, for runs that
+            # regenerate a proposal instead of replaying cached responses
+            self.llm_fast_uncached = self.llm_fast.model_copy(update={"cache": False})
+            self.llm_smart_uncached = self.llm_smart.model_copy(update={"cache": False})
             
-            # Initialize tools
-            self.web_search_tool = WebSearchTool()
-            self.kaggle_tool = KaggleTool()
-            self.github_tool = GitHubTool()
+            # Initialize tools on one pooled HTTP/2 client so searches reuse connections;
+            # the pool is sized for batch runs fanning out searches across many proposals
+            self._http = httpx.AsyncClient(
+                http2=True,
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+            )
+            self.web_search_tool = WebSearchTool(http_client=self._http)
+            self.kaggle_tool = KaggleTool(http_client=self._http)
+            self.github_tool = GitHubTool(http_client=self._http)
             
+            # Tool results are shared by all agents within a run (see _run_state), so a query
+            # already answered (or in flight) for one agent is not sent again for another
             # Create LangChain tools
             self.tools = [
-                Tool(
+                StructuredTool.from_function(
                     name="web_search",
                     description="Search the web for information about companies, industries, and AI trends",
-                    func=self.web_search_tool._run
+                    func=self._cached_tool_func("web_search", self.web_search_tool._run),
+                    coroutine=self._cached_tool_coroutine("web_search", self.web_search_tool._arun)
                 ),
-                Tool(
+                StructuredTool.from_function(
                     name="kaggle_search",
                     description="Search Kaggle for relevant datasets",
-                    func=self.kaggle_tool._run
+                    func=self._cached_tool_func("kaggle_search", self.kaggle_tool._run),
+                    coroutine=self._cached_tool_coroutine("kaggle_search", self.kaggle_tool._arun)
                 ),
-                Tool(
+                StructuredTool.from_function(
                     name="github_search",
                     description="Search GitHub for relevant repositories",
-                    func=self.github_tool._run
+                    func=self._cached_tool_func("github_search", self.github_tool._run),
+                    coroutine=self._cached_tool_coroutine("github_search", self.github_tool._arun)
                 )
             ]
             
+            # Stage outputs are stored once per run; downstream agents get a short summary
+            # in their prompt and fetch the full text through get_artifact only when needed
+            self.tools.append(
+                StructuredTool.from_function(
+                    name="get_artifact",
+                    description="Retrieve the full text of an earlier workflow stage by name, e.g. research_findings",
+                    func=self._get_artifact
+                )
+            )
+            self._tools_by_name = {tool.name: tool for tool in self.tools}
+            
+            # Each stage's chain or agent is built on first use and reused across runs (see _stage)
+            self._stages: Dict[Tuple[str, bool], Any] = {}
+            
+            # Recent successful proposals keyed by normalized (company, industry), so repeated
+            # requests (e.g. Streamlit reruns) return without re-running the agents
+            self._proposal_memo: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+            self._proposal_memo_stats = {"hits": 0, "misses": 0}
+            
+            # Dedicated event loop for the async workflow. The LLM and HTTP clients
+            # keep connections bound to the loop they were first used on, so every
+            # synchronous generate_proposal call is scheduled on this same loop.
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever,
+                name="proposal-event-loop",
+                daemon=True
+            )
+            self._loop_thread.start()
+            
             log_system_event("system_initialization", "Enhanced LangChain Multi-Agent AI System initialized successfully")
             logger.info("Enhanced LangChain Multi-Agent AI System initialized successfully")
             
         except Exception as e:
             error_report = create_error_report(e, {"context": "system_initialization"})
-            logger.error(f"System initialization failed: {error_report}")
+            logger.error("System initialization failed: %s", error_report)
             raise SystemError(f"Failed to initialize system: {str(e)}")
 
-    def _initialize_llm(self):
-        """Initialize LLM with proper API key validation"""
+    def _initialize_llm(self, model: str) -> "ChatOpenAI":
+        """Initialize an LLM for the given model with proper API key validation"""
+        from langchain_openai import ChatOpenAI
+        
         # Validate API key first
         if not settings.OPENROUTER_API_KEY:
             raise ConfigurationError("OPENROUTER_API_KEY is not configured. Please check your secrets or environment variables.")
         
-        logger.info(f"Initializing LLM with model: {settings.LLM_MODEL}")
-        logger.info(f"API Key configured: {'Yes' if settings.OPENROUTER_API_KEY else 'No'}")
+        logger.info("Initializing LLM with model: %s", model)
+        logger.info("API Key configured: %s", "Yes" if settings.OPENROUTER_API_KEY else "No")
         
         # Initialize LLM with provider routing for tool use
         llm = ChatOpenAI(
-            model=settings.LLM_MODEL,
+            model=model,
             temperature=settings.LLM_TEMPERATURE,
             max_tokens=settings.LLM_MAX_TOKENS,
+            streaming=True,
             api_key=settings.OPENROUTER_API_KEY,
             base_url="https://openrouter.ai/api/v1",
             default_headers={
@@ -104,322 +481,599 @@ class SimpleLangChainSystem:
         """Validate API connectivity before starting the workflow"""
         logger.info("Validating API connectivity...")
         
-        # Test OpenRouter API
-        try:
-            if not settings.OPENROUTER_API_KEY:
-                raise ConfigurationError("OPENROUTER_API_KEY is not configured")
-            
-            test_llm = ChatOpenAI(
-                model=settings.LLM_MODEL,
-                api_key=settings.OPENROUTER_API_KEY,
-                base_url="https://openrouter.ai/api/v1",
-                default_headers={
-                    "HTTP-Referer": "https://ai-planet.streamlit.app",
-                    "X-Title": "AI Use Case Generator"
-                }
-            )
-            test_response = test_llm.invoke("Test connectivity")
-            logger.info("■ OpenRouter API connectivity verified")
-        except Exception as e:
-            logger.error(f"■ OpenRouter API connectivity test failed: {str(e)}")
-            raise ConfigurationError(f"OpenRouter API test failed: {str(e)}")
+        # Check the OpenRouter key is present. There is no probe request: an invalid key
+        # surfaces as an API error on the first real call instead of costing every startup
+        if not settings.OPENROUTER_API_KEY:
+            logger.error("■ OpenRouter API key is not configured")
+            raise ConfigurationError("OPENROUTER_API_KEY is not configured")
+        logger.info("■ OpenRouter API key configured")
         
         # Test tools
         try:
             logger.info("■ All tools initialized successfully")
         except Exception as e:
-            logger.warning(f"Tool initialization failed: {str(e)}")
+            logger.warning("Tool initialization failed: %s", e)
         
         logger.info("API connectivity validation completed")
 
-    def _create_agent(self, system_prompt: str, agent_name: str) -> AgentExecutor:
-        """Create a LangChain agent with the given system prompt"""
-        # Create agent prompt template
-        agent_prompt = ChatPromptTemplate.from_messages([
+    def _stage(self, role: str) -> Any:
+        """Return the chain or tool-calling agent for a workflow role in the current run, building it on first use"""
+        # Runs that bypass caches get stages on the uncached LLMs
+        key = (role, self._run_state()["bypass_cache"])
+        if key not in self._stages:
+            self._stages[key] = self._build_stage(*key)
+        return self._stages[key]
+
+    def _build_stage(self, role: str, bypass_cache: bool = False) -> Any:
+        """Build the chain or agent for a role; per-run values are supplied as prompt variables"""
+        if bypass_cache:
+            llm_fast, llm_smart = self.llm_fast_uncached, self.llm_smart_uncached
+        else:
+            llm_fast, llm_smart = self.llm_fast, self.llm_smart
+        
+        # Research and proposal only synthesize their inputs, so they are plain chains
+        if role == "research":
+            return self._create_chain(RESEARCH_PROMPT, RESEARCH_INPUT, llm_fast)
+        if role == "proposal":
+            return self._create_chain(PROPOSAL_PROMPT, PROPOSAL_INPUT, llm_smart)
+        if role == "summary":
+            from utils.langchain_components import ResearchSummary
+            # Function calling rather than JSON schema mode, which not every OpenRouter model supports
+            return llm_fast.with_structured_output(ResearchSummary, method="function_calling")
+        if role == "consultant":
+            # Plan, parallel searches and write-up need a few more turns than a single stage
+            return self._create_agent(CONSULTANT_PROMPT, CONSULTANT_INPUT, llm=llm_smart, max_iterations=6)
+        if role == "use_case":
+            return self._create_agent(USE_CASE_PROMPT, USE_CASE_INPUT, llm=llm_smart)
+        if role in RESOURCE_KINDS:
+            # Resource roles are keyed by the search tool they are bound to
+            system_prompt = RESOURCE_PROMPT.format(resource_kind=RESOURCE_KINDS[role], tool_name=role)
+            return self._create_agent(system_prompt, RESOURCE_INPUT, tool_names=[role], llm=llm_fast)
+        raise ValueError(f"Unknown workflow role: {role}")
+
+    def _create_chain(self, system_prompt: str, input_template: str, llm: "ChatOpenAI") -> "Runnable":
+        """Create a tool-free prompt | LLM | text chain for stages that only synthesize their inputs"""
+        from langchain.prompts import ChatPromptTemplate
+        from langchain_core.output_parsers import StrOutputParser
+        
+        prompt = ChatPromptTemplate.from_messages([
             ("system", system_prompt),
-            MessagesPlaceholder(variable_name="chat_history"),
-            ("human", "{input}"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
+            ("human", input_template),
         ])
+        return prompt | llm | StrOutputParser()
+
+    def _create_agent(self, system_prompt: str, input_template: str, tool_names: Optional[List[str]] = None,
+                      llm: Optional["ChatOpenAI"] = None, max_iterations: int = 3) -> Dict[str, Any]:
+        """
+        Create a tool-calling agent with the given static system prompt and human turn template on the
+        given LLM (default: smart tier), optionally restricted to a subset of tools. Agents are stateless
+        and run by _run_tools_agent: every stage answers in a single call.
+        """
+        from langchain.prompts import ChatPromptTemplate
         
-        # Create agent
-        agent = create_openai_tools_agent(self.llm, self.tools, agent_prompt)
+        llm = llm or self.llm_smart
+        tools = [self._tools_by_name[name] for name in tool_names] if tool_names else self.tools
         
-        # Create agent executor with memory
-        memory = ConversationBufferMemory(
-            memory_key="chat_history",
-            return_messages=True
-        )
+        return {
+            "prompt": ChatPromptTemplate.from_messages([
+                ("system", system_prompt),
+                ("human", input_template),
+            ]),
+            # The model may return several tool calls per response; they are dispatched together
+            "llm": llm.bind_tools(tools, parallel_tool_calls=True),
+            # Used for the final answer once max_iterations tool rounds are spent
+            "final_llm": llm.bind_tools(tools, tool_choice="none"),
+            "tools": {tool.name: tool for tool in tools},
+            "max_iterations": max_iterations
+        }
+
+    async def _run_tools_agent(self, agent: Dict[str, Any], inputs: Dict[str, Any],
+                               callbacks: Optional[List[Any]] = None) -> str:
+        """Call the model, run its tool calls concurrently and feed the results back until it answers"""
+        from utils.langchain_components import ToolTraceHandler
         
-        agent_executor = AgentExecutor(
-            agent=agent,
-            tools=self.tools,
-            memory=memory,
-            verbose=True,
-            handle_parsing_errors=True,
-            max_iterations=3
-        )
+        # Tool calls are only traced when DEBUG logging is on, so the handler costs nothing otherwise
+        callbacks = list(callbacks or [])
+        if logger.isEnabledFor(logging.DEBUG):
+            callbacks.append(ToolTraceHandler())
+        config = {"callbacks": callbacks}
         
-        return agent_executor
+        messages = (await agent["prompt"].ainvoke(inputs)).to_messages()
+        for _ in range(agent["max_iterations"]):
+            response = await agent["llm"].ainvoke(messages, config=config)
+            if not response.tool_calls:
+                return response.content
+            tool_messages = await asyncio.gather(*[
+                self._dispatch_tool_call(agent["tools"], tool_call, config) for tool_call in response.tool_calls
+            ])
+            messages.extend([response, *tool_messages])
+        
+        response = await agent["final_llm"].ainvoke(messages, config=config)
+        return response.content
 
-    def _research_agent(self, company: str, industry: str) -> str:
-        """Research Agent - conducts market research"""
-        logger.info("■ Research Agent: Starting market research...")
+    async def _dispatch_tool_call(self, tools: Dict[str, Any], tool_call: Dict[str, Any], config: Dict[str, Any]) -> Any:
+        """Run one tool call and wrap its output (or error) as the ToolMessage answering it"""
+        from langchain_core.messages import ToolMessage
         
-        # Create research prompt
-        research_prompt = f"""
-        You are a Senior Market Research Analyst. Conduct comprehensive market research for {company} in the {industry} sector.
+        tool = tools.get(tool_call["name"])
+        try:
+            if tool is None:
+                content = f"Unknown tool: {tool_call['name']}"
+            else:
+                content = str(await tool.ainvoke(tool_call["args"], config=config))
+        except Exception as e:
+            logger.warning("Tool %s failed: %s", tool_call["name"], e)
+            content = f"Tool {tool_call['name']} failed: {str(e)}"
+        return ToolMessage(content=content, tool_call_id=tool_call["id"])
+
+    def _begin_run(self, on_progress: Optional[Callable[[str, float], None]] = None, total_steps: int = 1,
+                   bypass_cache: bool = False) -> None:
+        """Give the current task a fresh tool cache, artifact store and progress counter"""
+        _current_run.set({
+            "bypass_cache": bypass_cache,
+            "tool_cache": {},
+            "tool_inflight": {},
+            "artifacts": {},
+            "on_progress": on_progress,
+            "steps_done": 0,
+            "total_steps": total_steps
+        })
+
+    def _report_progress(self, message: str) -> None:
+        """Mark one workflow step of the current run as done and notify the run's progress callback"""
+        state = self._run_state()
+        state["steps_done"] += 1
+        if state["on_progress"]:
+            state["on_progress"](message, min(state["steps_done"] / state["total_steps"], 1.0))
+
+    def _run_state(self) -> Dict[str, Any]:
+        """Return the current run's state, starting a run if none is active (e.g. direct tool calls)"""
+        state = _current_run.get(None)
+        if state is None:
+            self._begin_run()
+            state = _current_run.get()
+        return state
+
+    def _cached_tool_func(self, tool_name: str, func: Callable[[str], str]) -> Callable[[str], str]:
+        """Wrap a synchronous tool so repeated queries within a run hit the shared tool cache"""
+        def run(query: str) -> str:
+            state = self._run_state()
+            tool_cache = state["tool_cache"]
+            key = (tool_name, query.strip().lower())
+            if key not in tool_cache:
+                tool_cache[key] = func(query, bypass_cache=state["bypass_cache"])
+            return tool_cache[key]
+        return run
+
+    def _cached_tool_coroutine(self, tool_name: str, coroutine: Callable[[str], Any]) -> Callable[[str], Any]:
+        """Wrap an async tool so repeated or concurrent queries within a run share one request"""
+        limit = asyncio.Semaphore(self.TOOL_CONCURRENCY)
         
-        COMPANY: {company}
-        INDUSTRY: {industry}
+        async def limited(query: str, bypass_cache: bool) -> str:
+            async with limit:
+                return await coroutine(query, bypass_cache=bypass_cache)
         
-        RESEARCH REQUIREMENTS:
-        1. Use the web_search tool to find recent reports and industry analyses
-        2. Focus on authoritative sources: McKinsey, Deloitte, PwC, BCG, company reports
-        3. Search for specific queries like:
-           - "{industry} AI adoption trends 2025"
-           - "{company} annual report AI strategy"
-           - "{industry} market research McKinsey Deloitte"
-           - "{company} competitive analysis technology sector"
+        async def arun(query: str) -> str:
+            state = self._run_state()
+            tool_cache, tool_inflight = state["tool_cache"], state["tool_inflight"]
+            key = (tool_name, query.strip().lower())
+            if key in tool_cache:
+                return tool_cache[key]
+            
+            task = tool_inflight.get(key)
+            if task is None:
+                task = tool_inflight[key] = asyncio.ensure_future(limited(query, state["bypass_cache"]))
+            try:
+                # Shield so one cancelled agent does not cancel the request for the others
+                result = await asyncio.shield(task)
+            finally:
+                if task.done():
+                    tool_inflight.pop(key, None)
+            tool_cache[key] = result
+            return result
+        return arun
+
+    def _get_artifact(self, name: str) -> str:
+        """Return the full output of an earlier stage from this run's artifact store"""
+        artifacts = self._run_state()["artifacts"]
+        name = name.strip().strip("'\"").lower()
+        if name in artifacts:
+            return artifacts[name]
+        return f"No artifact named '{name}'. Available artifacts: {', '.join(artifacts) or 'none'}"
+
+    async def _store_artifact(self, name: str, text: str) -> str:
+        """Store a stage output and return a compact structured summary of it for downstream prompts"""
+        from langchain_core.exceptions import OutputParserException
+        from pydantic import ValidationError as SchemaValidationError
         
-        OUTPUT FORMAT:
-        Provide a comprehensive research report with:
-        - Executive Summary (2-3 paragraphs)
-        - Industry analysis and trends
-        - Competitive landscape
-        - Market opportunities
-        - Strategic recommendations
+        self._run_state()["artifacts"][name] = text
+        try:
+            summary = await self._stage("summary").ainvoke([
+                ("system", ARTIFACT_SUMMARY_PROMPT.format(artifact_name=name.replace("_", " "))),
+                ("human", text)
+            ])
+        except (OutputParserException, SchemaValidationError) as e:
+            # Malformed function arguments should not abort a run whose research is already done
+            logger.warning("Structured summary of %s could not be parsed: %s", name, e)
+            summary = None
+        if summary is None:
+            # The model answered without a usable extraction call; pass on the opening instead
+            logger.warning("Could not extract a structured summary of %s; truncating it instead", name)
+            return text[:2000]
+        return summary.to_prompt()
+
+    async def _research_agent(self, company: str, industry: str) -> str:
+        """Research Agent - conducts market research over web searches run up front"""
+        logger.info("■ Research Agent: Starting market research...")
         
-        Include specific data points, statistics, and quantitative insights with source citations.
-        """
+        # The queries are fixed, so run them concurrently instead of letting an agent loop pick them
+        web_search = self._tools_by_name["web_search"]
+        queries = [query.format(company=company, industry=industry) for query in RESEARCH_QUERIES]
+        search_results = await asyncio.gather(*[web_search.arun(query) for query in queries])
         
-        # Create and execute agent
-        agent = self._create_agent(research_prompt, "Research Agent")
-        result = agent.invoke({
-            "input": f"Conduct comprehensive market research for {company} in {industry}. Use the web_search tool to find authoritative sources and current market intelligence."
+        research_findings = await self._stage("research").ainvoke({
+            "company": company,
+            "industry": industry,
+            "search_results": "\n\n".join(f"### {query}\n{result}" for query, result in zip(queries, search_results)),
+            "input": f"Conduct comprehensive market research for {company} in {industry} from the search results, citing authoritative sources and current market intelligence."
         })
         
         logger.info("■ Research Agent: Market research completed")
-        return result["output"]
+        self._report_progress("🔍 Research Agent: Market analysis completed")
+        return research_findings
 
-    def _use_case_agent(self, company: str, industry: str, research_findings: str) -> str:
+    async def _use_case_agent(self, company: str, industry: str, research_summary: str) -> str:
         """Use Case Agent - generates 15-20 detailed AI use cases with validation"""
         logger.info("■ Use Case Agent: Generating AI use cases...")
         
-        # Enhanced use case prompt with strict requirements
-        use_case_prompt = f"""
-        You are an AI/ML Industry Specialist and Use Case Strategist. Generate EXACTLY 15-20 detailed AI use cases for {company} in the {industry} industry.
-        
-        COMPANY: {company}
-        INDUSTRY: {industry}
-        
-        RESEARCH FINDINGS:
-        {research_findings}
-        
-        CRITICAL REQUIREMENTS - MUST BE FOLLOWED EXACTLY:
-        - Generate EXACTLY 15-20 detailed AI use cases (no more, no less)
-        - Distribute EXACTLY across these 5 categories:
-          * Generative AI & LLMs: 4-5 use cases (include keywords: generative ai, llm, chatbot, content generation)
-          * Computer Vision: 4-5 use cases (include keywords: computer vision, image recognition, visual inspection)
-          * Predictive Analytics & ML: 4-5 use cases (include keywords: predictive analytics, forecasting, machine learning)
-          * Natural Language Processing: 2-3 use cases (include keywords: nlp, text analysis, sentiment analysis)
-          * Automation & Optimization: 2-3 use cases (include keywords: automation, optimization, process automation)
-        
-        Each use case MUST include:
-        - Description
-        - ROI estimate
-        - Implementation complexity
-        - Cross-functional impact
-        - Business value
-        
-        Use the web_search tool to find current AI use cases and industry benchmarks.
-        """
-        
-        # Create and execute agent
-        agent = self._create_agent(use_case_prompt, "Use Case Agent")
-        result = agent.invoke({
+        use_cases = await self._run_tools_agent(self._stage("use_case"), {
+            "company": company,
+            "industry": industry,
+            "research_summary": research_summary,
             "input": f"Generate 15-20 detailed AI use cases for {company} in {industry} based on the research findings. Use the web_search tool to find current industry benchmarks and ensure proper category distribution."
         })
         
         logger.info("■ Use Case Agent: AI use cases generated")
-        return result["output"]
+        self._report_progress("🤖 Use Case Agent: AI use cases generated")
+        return use_cases
 
-    def _resource_agent(self, company: str, industry: str, research_findings: str, use_cases: str) -> str:
+    async def _research_and_use_cases(self, company: str, industry: str) -> Tuple[str, str, str]:
+        """Run Research then Use Cases; returns (research findings, research summary, use cases)"""
+        research_findings = await self._research_agent(company, industry)
+        research_summary = await self._store_artifact("research_findings", research_findings)
+        use_cases = await self._use_case_agent(company, industry, research_summary)
+        return research_findings, research_summary, use_cases
+
+    async def _resource_agent(self, company: str, industry: str) -> str:
         """Resource Agent - collects datasets and repositories"""
         logger.info("■ Resource Agent: Collecting resources...")
         
-        # Create resource prompt
-        resource_prompt = f"""
-        You are an AI/ML Resource Collection Specialist. Collect relevant datasets and GitHub repositories for {company} in the {industry} industry.
-        
-        COMPANY: {company}
-        INDUSTRY: {industry}
-        
-        RESEARCH FINDINGS:
-        {research_findings}
-        
-        USE CASES:
-        {use_cases}
+        # Kaggle and GitHub searches are independent, so run one sub-agent per tool concurrently
+        dataset_findings, repository_findings = await asyncio.gather(
+            self._resource_sub_agent(company, industry, "kaggle_search"),
+            self._resource_sub_agent(company, industry, "github_search")
+        )
         
-        REQUIREMENTS:
-        1. Use kaggle_search tool to find relevant datasets
-        2. Use github_search tool to find relevant repositories
-        3. Focus on {industry}-specific and {company}-relevant resources
-        4. Include at least 3-5 Kaggle datasets with clickable links
-        5. Include at least 3-5 GitHub repositories with clickable links
-        6. Provide quality assessments for each resource
+        logger.info("■ Resource Agent: Resources collected")
+        self._report_progress("📊 Resource Agent: Datasets and repositories curated")
+        return f"""### Kaggle Datasets
+
+{dataset_findings}
+
+### GitHub Repositories
+
+{repository_findings}"""
+
+    async def _resource_sub_agent(self, company: str, industry: str, tool_name: str) -> str:
+        """Resource sub-agent bound to a single search tool (kaggle_search or github_search)"""
+        resource_kind = RESOURCE_KINDS[tool_name]
+        return await self._run_tools_agent(self._stage(tool_name), {
+            "company": company,
+            "industry": industry,
+            "input": f"Collect relevant {resource_kind} for {company} in {industry}. Use the {tool_name} tool to find quality resources with clickable links."
+        })
+
+    async def _proposal_agent(self, company: str, industry: str, research_summary: str, use_cases: str, resources: str,
+                              on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Proposal Agent - creates final business proposal, streaming tokens to on_token if given"""
+        from utils.langchain_components import TokenStreamHandler
         
-        OUTPUT FORMAT:
-        - Executive Summary
-        - Datasets with direct links and quality assessments
-        - GitHub repositories with direct links and quality assessments
-        - Implementation recommendations
-        """
+        logger.info("■ Proposal Agent: Creating final proposal...")
         
-        # Create and execute agent
-        agent = self._create_agent(resource_prompt, "Resource Agent")
-        result = agent.invoke({
-            "input": f"Collect relevant datasets and repositories for {company} in {industry}. Use the kaggle_search and github_search tools to find quality resources with clickable links."
-        })
+        # Pure synthesis over the earlier stages: a single LLM call, no tools or agent loop
+        stream_handler = TokenStreamHandler(on_token) if on_token else None
+        callbacks = [stream_handler] if stream_handler else []
+        final_proposal = await self._stage("proposal").ainvoke(
+            {
+                "company": company,
+                "industry": industry,
+                "research_summary": research_summary,
+                "use_cases": use_cases,
+                "resources": resources,
+                "input": f"Create a comprehensive business proposal for {company} in {industry} incorporating all research, use cases, and resources with complete clickable links."
+            },
+            config={"callbacks": callbacks}
+        )
+        if stream_handler and not stream_handler.streamed:
+            # Answered from the LLM cache: send the whole text, as for a memoized proposal
+            on_token(final_proposal)
         
-        logger.info("■ Resource Agent: Resources collected")
-        return result["output"]
+        logger.info("■ Proposal Agent: Final proposal created")
+        self._report_progress("📋 Proposal Agent: Business proposal created")
+        return final_proposal
 
-    def _proposal_agent(self, company: str, industry: str, research_findings: str, use_cases: str, resources: str) -> str:
-        """Proposal Agent - creates final business proposal"""
-        logger.info("■ Proposal Agent: Creating final proposal...")
+    async def _consultant_agent(self, company: str, industry: str, on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Consultant Agent - single-pass research, resources and proposal in one agent turn"""
+        from utils.langchain_components import TokenStreamHandler
         
-        # Create proposal prompt
-        proposal_prompt = f"""
-        You are a Senior Business Strategy Consultant and Proposal Writer. Create a comprehensive business proposal for {company} in the {industry} industry.
+        logger.info("■ Consultant Agent: Researching and writing proposal...")
         
-        COMPANY: {company}
-        INDUSTRY: {industry}
+        stream_handler = TokenStreamHandler(on_token) if on_token else None
+        callbacks = [stream_handler] if stream_handler else []
+        final_proposal = await self._run_tools_agent(
+            self._stage("consultant"),
+            {
+                "company": company,
+                "industry": industry,
+                "input": f"Research {company} in {industry}, collect Kaggle datasets and GitHub repositories, and write the complete AI use case proposal with clickable links."
+            },
+            callbacks
+        )
+        if stream_handler and not stream_handler.streamed:
+            # Answered from the LLM cache: send the whole text, as for a memoized proposal
+            on_token(final_proposal)
         
-        RESEARCH FINDINGS:
-        {research_findings}
+        logger.info("■ Consultant Agent: Proposal created")
+        self._report_progress("📋 Consultant Agent: Business proposal created")
+        return final_proposal
+
+    def generate_proposal(self, company: str, industry: str, on_token: Optional[Callable[[str], None]] = None,
+                          on_progress: Optional[Callable[[str, float], None]] = None,
+                          bypass_cache: bool = False) -> Dict[str, Any]:
+        """
+        Generate a comprehensive AI use case proposal
+        Args:
+            company: Company name
+            industry: Industry sector
+            on_token: Optional callback receiving proposal tokens as they stream (called from the event loop thread)
+            on_progress: Optional callback receiving (step message, fraction done) as workflow steps complete
+                (called from the event loop thread)
+            bypass_cache: Regenerate from scratch, ignoring the memoized proposal and cached LLM and search results
+        Returns:
+            Dictionary containing the proposal results
+        """
+        return self.submit_proposal(company, industry, on_token, on_progress, bypass_cache).result()
+
+    def submit_proposal(self, company: str, industry: str, on_token: Optional[Callable[[str], None]] = None,
+                        on_progress: Optional[Callable[[str, float], None]] = None,
+                        bypass_cache: bool = False) -> "concurrent.futures.Future[Dict[str, Any]]":
+        """
+        Start generating a proposal on the background event loop without blocking the caller
+        Args:
+            company: Company name
+            industry: Industry sector
+            on_token: Optional callback receiving proposal tokens as they stream (called from the event loop thread)
+            on_progress: Optional callback receiving (step message, fraction done) as workflow steps complete
+                (called from the event loop thread)
+            bypass_cache: Regenerate from scratch, ignoring the memoized proposal and cached LLM and search results
+        Returns:
+            Future resolving to the proposal result dictionary
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.agenerate_proposal(company, industry, on_token, on_progress, bypass_cache), self._loop
+        )
+
+    def generate_proposal_stream(self, company: str, industry: str) -> Iterator[Union[str, Dict[str, Any]]]:
+        """
+        Generate a proposal, yielding the final proposal text as it streams
+        Args:
+            company: Company name
+            industry: Industry sector
+        Yields:
+            Proposal text chunks, then the proposal result dictionary as the last item
+        """
+        chunks: "queue.Queue[Optional[str]]" = queue.Queue()
+        future = self.submit_proposal(company, industry, chunks.put)
+        future.add_done_callback(lambda _: chunks.put(None))
         
-        USE CASES:
-        {use_cases}
+        while (chunk := chunks.get()) is not None:
+            yield chunk
+        yield future.result()
+
+    async def astream_proposal(self, company: str, industry: str) -> AsyncIterator[Union[str, Dict[str, Any]]]:
+        """
+        Generate a proposal, yielding the final proposal text as it streams (async)
+        Args:
+            company: Company name
+            industry: Industry sector
+        Yields:
+            Proposal text chunks, then the proposal result dictionary as the last item
+        """
+        # The proposal runs on the system's own loop, which owns the shared clients, tool limits
+        # and memo; its tokens are handed back to this (caller's) loop thread-safely
+        caller_loop = asyncio.get_running_loop()
+        chunks: "asyncio.Queue[Optional[str]]" = asyncio.Queue()
         
-        RESOURCES:
-        {resources}
+        def put(chunk: Optional[str]) -> None:
+            caller_loop.call_soon_threadsafe(chunks.put_nowait, chunk)
         
-        PROPOSAL REQUIREMENTS:
-        1. Executive Summary
-        2. Business Case
-        3. AI Use Cases (MANDATORY: Include the complete use case analysis from above)
-        4. Implementation Roadmap
-        5. Budget and ROI
-        6. Resource Assets & Implementation Support (MANDATORY: Include clickable links)
-        7. Risk Management
-        8. Next Steps
+        future = self.submit_proposal(company, industry, put)
+        future.add_done_callback(lambda _: put(None))
         
-        CRITICAL: Section 3 (AI Use Cases) MUST include the complete 15-20 detailed use cases from above.
-        CRITICAL: Include all clickable links to datasets and repositories.
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        yield await asyncio.wrap_future(future)
+
+    def generate_proposals(self, pairs: List[Tuple[str, str]], max_concurrency: int = 10,
+                           batch_size: Optional[int] = None, batch_delay: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Generate proposals for many companies concurrently
+        Args:
+            pairs: (company, industry) pairs
+            max_concurrency: Maximum number of proposals in flight at once
+            batch_size: Start proposals in batches of this size (default: all at once)
+            batch_delay: Seconds between the starts of consecutive batches, to pace requests per minute
+        Returns:
+            List of proposal result dictionaries, in the order of pairs
         """
+        future = asyncio.run_coroutine_threadsafe(
+            self.agenerate_proposals(pairs, max_concurrency, batch_size, batch_delay), self._loop
+        )
+        return future.result()
+
+    async def agenerate_proposals(self, pairs: List[Tuple[str, str]], max_concurrency: int = 10,
+                                  batch_size: Optional[int] = None, batch_delay: float = 0.0) -> List[Dict[str, Any]]:
+        """
+        Generate proposals for many companies concurrently (async)
+        Args:
+            pairs: (company, industry) pairs
+            max_concurrency: Maximum number of proposals in flight at once
+            batch_size: Start proposals in batches of this size (default: all at once)
+            batch_delay: Seconds between the starts of consecutive batches, to pace requests per minute
+        Returns:
+            List of proposal result dictionaries, in the order of pairs
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        batch_size = batch_size or len(pairs) or 1
         
-        # Create and execute agent
-        agent = self._create_agent(proposal_prompt, "Proposal Agent")
-        result = agent.invoke({
-            "input": f"Create a comprehensive business proposal for {company} in {industry} incorporating all research, use cases, and resources with complete clickable links."
-        })
+        async def run(index: int, company: str, industry: str) -> Dict[str, Any]:
+            # Batch n may not start before n * batch_delay seconds, however fast earlier batches finish
+            await asyncio.sleep(index // batch_size * batch_delay)
+            async with semaphore:
+                return await self.agenerate_proposal(company, industry)
         
-        logger.info("■ Proposal Agent: Final proposal created")
-        return result["output"]
+        # Each proposal is its own task (and so its own run state); every stage of every
+        # proposal proceeds as soon as its inputs are ready rather than waiting on the batch
+        return await asyncio.gather(*[run(index, company, industry) for index, (company, industry) in enumerate(pairs)])
 
-    def generate_proposal(self, company: str, industry: str) -> Dict[str, Any]:
+    async def agenerate_proposal(self, company: str, industry: str, on_token: Optional[Callable[[str], None]] = None,
+                                 on_progress: Optional[Callable[[str, float], None]] = None,
+                                 bypass_cache: bool = False) -> Dict[str, Any]:
         """
-        Generate a comprehensive AI use case proposal
+        Generate a comprehensive AI use case proposal (async)
         Args:
             company: Company name
             industry: Industry sector
+            on_token: Optional callback receiving proposal tokens as they stream
+            on_progress: Optional callback receiving (step message, fraction done) as workflow steps complete
+            bypass_cache: Regenerate from scratch, ignoring the memoized proposal and cached LLM and search results
         Returns:
             Dictionary containing the proposal results
         """
         try:
             validate_company_input(company)
             validate_industry_input(industry)
-            log_system_event("proposal_generation_started", f"Starting proposal generation for {company} in {industry}")
-            logger.info(f"Starting proposal generation for {company} in {industry}")
-            
-            # Execute workflow sequentially
-            logger.info("Executing LangChain multi-agent workflow...")
             
-            # Step 1: Research
-            research_findings = self._research_agent(company, industry)
+            # Normalize once at ingress; the casefolded pair identifies the proposal
+            company, industry = company.strip(), industry.strip()
+            memo_key = (company.casefold(), industry.casefold())
+            if bypass_cache:
+                # Only this proposal is forgotten; the new result takes its place in the memo
+                self._proposal_memo.pop(memo_key, None)
+            elif memo_key in self._proposal_memo:
+                self._proposal_memo_stats["hits"] += 1
+                self._proposal_memo.move_to_end(memo_key)
+                cached = self._proposal_memo[memo_key]
+                logger.info("Returning cached proposal for %s in %s", company, industry)
+                if on_token:
+                    on_token(cached["result"])
+                if on_progress:
+                    on_progress("✅ Loaded previously generated proposal", 1.0)
+                return cached
+            self._proposal_memo_stats["misses"] += 1
             
-            # Step 2: Use Cases
-            use_cases = self._use_case_agent(company, industry, research_findings)
-            
-            # Step 3: Resources
-            resources = self._resource_agent(company, industry, research_findings, use_cases)
+            log_system_event("proposal_generation_started", f"Starting proposal generation for {company} in {industry}")
+            logger.info("Starting proposal generation for %s in %s", company, industry)
             
-            # Step 4: Final Proposal
-            final_proposal = self._proposal_agent(company, industry, research_findings, use_cases, resources)
+            # Agents are reused across runs, so start each proposal with its own tool cache,
+            # artifacts and progress count (workflow steps plus the final export)
+            self._begin_run(on_progress, total_steps=2 if settings.SINGLE_PASS_PROPOSAL else 5, bypass_cache=bypass_cache)
             
-            # Generate consolidated report
-            consolidated_report = self._generate_consolidated_report({
-                "company": company,
-                "industry": industry,
-                "timestamp": datetime.now().isoformat(),
-                "research_findings": research_findings,
-                "use_cases": use_cases,
-                "resources": resources,
-                "proposal": final_proposal
-            })
+            if settings.SINGLE_PASS_PROPOSAL:
+                # One agent turn: {searches} -> {write-up}. There are no separate stage outputs:
+                # the research, use cases and resources are sections of the proposal itself
+                logger.info("Executing single-pass consultant workflow...")
+                final_proposal = await self._consultant_agent(company, industry, on_token)
+                stage_outputs = {}
+            else:
+                # Execute workflow as a DAG: (Research -> Use Cases) || Resources -> Proposal
+                logger.info("Executing LangChain multi-agent workflow...")
+                
+                # Steps 1-3: Resources only need company and industry, so they are collected
+                # while the Research -> Use Cases chain runs
+                (research_findings, research_summary, use_cases), resources = await asyncio.gather(
+                    self._research_and_use_cases(company, industry),
+                    self._resource_agent(company, industry)
+                )
+                
+                # Step 4: Final Proposal
+                final_proposal = await self._proposal_agent(company, industry, research_summary, use_cases, resources, on_token)
+                stage_outputs = {
+                    "research_findings": research_findings,
+                    "use_cases": use_cases,
+                    "resources": resources
+                }
             
             # Validate output
             self._validate_proposal_output(final_proposal, company, industry)
             
-            # Save outputs
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            generated_at = datetime.now()
+            timestamp = generated_at.strftime("%Y%m%d_%H%M%S")
             
-            # Generate Excel report (company format) - in memory for download
-            excel_generator = ExcelReportGenerator()
-            excel_content = excel_generator.generate_excel_content({
-                "company": company,
-                "industry": industry,
-                "timestamp": timestamp,
-                "use_cases": use_cases,
-                "research_findings": research_findings,
-                "resources": resources
-            })
-            
-            # Prepare JSON data for download
+            # Prepare JSON data for download; stage outputs are only included when they were produced
             output_data = {
                 "company": company,
                 "industry": industry,
                 "timestamp": timestamp,
                 "result": final_proposal,
-                "research_findings": research_findings,
-                "use_cases": use_cases,
-                "resources": resources,
+                **stage_outputs,
                 "status": "success"
             }
             
-            json_content = json.dumps(output_data, indent=2, ensure_ascii=False)
+            from utils.excel_generator import ExcelReportGenerator
             
+            # Build the consolidated report, Excel workbook (company format) and JSON
+            # export concurrently in worker threads so the event loop is not blocked
+            consolidated_report, excel_content, json_content = await asyncio.gather(
+                asyncio.to_thread(self._generate_consolidated_report, {
+                    "company": company,
+                    "industry": industry,
+                    "timestamp": generated_at,
+                    **stage_outputs,
+                    "proposal": final_proposal
+                }),
+                asyncio.to_thread(ExcelReportGenerator().generate_excel_content, {
+                    "company": company,
+                    "industry": industry,
+                    "timestamp": timestamp,
+                    # Single-pass runs have no separate use case text; the workbook extracts the
+                    # numbered use cases from the proposal instead
+                    "use_cases": stage_outputs.get("use_cases", final_proposal)
+                }),
+                asyncio.to_thread(orjson.dumps, output_data, option=orjson.OPT_INDENT_2)
+            )
+            
+            self._report_progress("✅ Consolidation: Report, Excel and JSON outputs generated")
             log_system_event("proposal_generation_completed", f"Proposal generated successfully for {company}")
-            logger.info(f"Proposal generated successfully for {company}")
+            logger.info("Proposal generated successfully for %s", company)
             
-            return {
-                "status": "success",
-                "company": company,
-                "industry": industry,
-                "result": final_proposal,
-                "consolidated_report": consolidated_report,
-                "research_findings": research_findings,
-                "use_cases": use_cases,
-                "resources": resources,
-                "excel_content": excel_content,
-                "json_content": json_content,
-                "timestamp": timestamp
-            }
+            # The exported fields are the result fields; add the generated documents to the same dict
+            # The report is also kept encoded, ready for download like the Excel and JSON payloads;
+            # the result is shared through the memo, so readers must never have to add to it
+            output_data.update(
+                consolidated_report=consolidated_report,
+                consolidated_report_bytes=consolidated_report.encode("utf-8"),
+                excel_content=excel_content,
+                json_content=json_content
+            )
+            self._proposal_memo[memo_key] = output_data
+            if len(self._proposal_memo) > self.PROPOSAL_MEMO_SIZE:
+                self._proposal_memo.popitem(last=False)
+            return output_data
             
         except ValidationError as e:
             error_report = create_error_report(e, {"company": company, "industry": industry})
-            logger.error(f"Validation error: {error_report}")
+            logger.error("Validation error: %s", error_report)
             return {
                 "status": "error",
                 "error_type": "validation",
@@ -429,7 +1083,7 @@ class SimpleLangChainSystem:
             }
         except APIError as e:
             error_report = create_error_report(e, {"company": company, "industry": industry})
-            logger.error(f"API error: {error_report}")
+            logger.error("API error: %s", error_report)
             return {
                 "status": "error",
                 "error_type": "api",
@@ -439,7 +1093,7 @@ class SimpleLangChainSystem:
             }
         except Exception as e:
             error_report = create_error_report(e, {"company": company, "industry": industry})
-            logger.error(f"Unexpected error generating proposal for {company}: {error_report}")
+            logger.error("Unexpected error generating proposal for %s: %s", company, error_report)
             return {
                 "status": "error",
                 "error_type": "unexpected",
@@ -451,20 +1105,18 @@ class SimpleLangChainSystem:
     def _generate_consolidated_report(self, data: Dict[str, Any]) -> str:
         """Generate single consolidated markdown report"""
         
-        sections = []
-        
         # Header
-        sections.append(f"""# AI Use Case Generation Report
+        header = f"""# AI Use Case Generation Report
 ## {data['company']} - {data['industry']} Sector
 
-**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
+**Generated:** {data['timestamp']:%Y-%m-%d %H:%M:%S}  
 **System:** LangChain Multi-Agent AI Use Case Generator  
 **Status:** Complete
 
----""")
+---"""
 
         # Executive Summary
-        sections.append(f"""## 1. Executive Summary
+        executive_summary = f"""## 1. Executive Summary
 
 This comprehensive report presents AI and GenAI use cases specifically tailored for {data['company']} in the {data['industry']} industry. Our multi-agent research system conducted thorough market analysis and identified **15-20 high-impact AI implementation opportunities** across five core technology categories.
 
@@ -472,41 +1124,15 @@ This comprehensive report presents AI and GenAI use cases specifically tailored
 - **Industry Analysis**: Comprehensive market research conducted using authoritative sources
 - **Use Case Generation**: 15-20 detailed AI use cases across 5 technology categories  
 - **Resource Identification**: Curated datasets and implementation resources from Kaggle and GitHub
-- **Business Impact**: Each use case includes ROI estimates and implementation complexity analysis""")
-
-        # Methodology  
-        sections.append("""## 2. Methodology
-
-### Multi-Agent Research Architecture
-Our AI use case generation employs a sophisticated 4-agent system:
-
-#### Research Agent
-- Comprehensive market and industry analysis
-- Authoritative source research (McKinsey, Deloitte, PwC, BCG)
-- Competitive landscape assessment
-
-#### Use Case Generation Agent
-- Generate 15-20 detailed AI use cases
-- Strict category distribution validation
-- ROI and complexity analysis
-
-#### Resource Collection Agent
-- Identify implementation resources
-- Curate Kaggle datasets and GitHub repositories
-- Quality assessment and relevance scoring
-
-#### Proposal Generation Agent
-- Consolidate findings into business proposal
-- Professional formatting and structure
-- Actionable implementation roadmap""")
+- **Business Impact**: Each use case includes ROI estimates and implementation complexity analysis"""
 
         # Research Findings
-        sections.append(f"""## 3. Industry Research and Analysis
+        research = f"""## 3. Industry Research and Analysis
 
-{data.get('research_findings', 'Comprehensive industry analysis conducted across multiple authoritative sources.')}""")
+{data.get('research_findings', 'Comprehensive industry analysis conducted across multiple authoritative sources.')}"""
 
         # Use Cases
-        sections.append(f"""## 4. AI Use Cases Portfolio
+        use_cases = f"""## 4. AI Use Cases Portfolio
 
 ### Overview
 The following 15-20 AI use cases have been specifically designed for implementation, organized across five core technology categories:
@@ -517,80 +1143,18 @@ The following 15-20 AI use cases have been specifically designed for implementat
 - **Natural Language Processing**: 2-3 use cases
 - **Automation & Optimization**: 2-3 use cases
 
-{data.get('use_cases', 'Detailed use cases will be populated here with specific implementations tailored to the industry and company requirements.')}""")
+{data.get('use_cases', 'Detailed use cases will be populated here with specific implementations tailored to the industry and company requirements.')}"""
 
         # Resources
-        sections.append(f"""## 5. Resource Assets and Implementation Support
+        resources = f"""## 5. Resource Assets and Implementation Support
 
 ### Curated Resources
 The following datasets and repositories have been identified to support use case implementation:
 
-{data.get('resources', 'Curated resource collection with relevant datasets from Kaggle and implementation examples from GitHub.')}""")
-
-        # Implementation Roadmap
-        sections.append(f"""## 6. Implementation Roadmap
-
-### Phase 1: Foundation (Months 1-3)
-- Infrastructure setup and team formation
-- Data pipeline development
-- Pilot use case selection and development
-
-### Phase 2: Core Implementation (Months 4-9)
-- Primary use cases implementation
-- System integration and testing
-- Performance monitoring and optimization
-
-### Phase 3: Scale and Enhancement (Months 10-12)
-- Remaining use cases deployment
-- Advanced analytics and monitoring
-- Continuous improvement processes""")
-
-        # Budget and ROI
-        sections.append("""## 7. Budget and ROI Analysis
-
-### Investment Categories
-- **Technology Infrastructure (35-40%)**: Cloud resources, AI platforms, development tools
-- **Human Resources (40-45%)**: AI engineers, project managers, training
-- **Data and Licensing (10-15%)**: Dataset acquisition, API services, software licenses
-- **Operations and Maintenance (5-10%)**: Monitoring, updates, support
-
-### ROI Projections
-- **Year 1**: Infrastructure investment, initial cost savings
-- **Year 2**: Operational efficiency gains, process optimization  
-- **Year 3**: Revenue enhancement, competitive advantage
-- **3-Year Total**: Projected 300-500% ROI based on industry benchmarks""")
-
-        # Risk Management
-        sections.append("""## 8. Risk Management
-
-### Key Risks and Mitigation Strategies
-- **Technical Risks**: Model performance, data quality, integration challenges
-- **Business Risks**: User adoption, ROI realization, competitive response
-- **Operational Risks**: Talent availability, technology evolution, budget management
-
-### Mitigation Approaches
-Each risk includes specific mitigation strategies, contingency plans, and monitoring frameworks.""")
-
-        # Next Steps
-        sections.append("""## 9. Next Steps
-
-### Immediate Actions (Week 1-2)
-1. Executive review and budget approval
-2. Core team assembly and vendor selection
-3. Project charter development
-
-### Foundation Phase (Month 1-3)  
-1. Infrastructure deployment
-2. Data integration and quality processes
-3. Pilot use case development
-
-### Success Metrics
-- Use case implementation completion rate
-- Performance against ROI projections
-- User adoption and satisfaction scores""")
+{data.get('resources', 'Curated resource collection with relevant datasets from Kaggle and implementation examples from GitHub.')}"""
 
         # Results and Conclusions
-        sections.append(f"""## 10. Results and Conclusions
+        conclusions = f"""## 10. Results and Conclusions
 
 ### Research Summary
 This comprehensive analysis identified significant AI implementation opportunities for {data['company']} in the {data['industry']} sector. Through systematic multi-agent research, we have validated 15-20 high-impact use cases across all major AI technology categories.
@@ -602,67 +1166,97 @@ This comprehensive analysis identified significant AI implementation opportuniti
 - **Innovation Leadership**: AI-forward positioning in industry
 
 ### Implementation Confidence
-High success probability projected based on industry benchmarks and resource availability analysis.""")
-
-        # References
-        sections.append("""## 11. References
-
-### Sources
-- McKinsey Global Institute AI reports and analyses
-- Deloitte Technology Trends and Digital Transformation studies
-- PwC AI and Automation industry benchmarks  
-- Boston Consulting Group AI implementation case studies
-- Kaggle datasets and GitHub implementation repositories
-
----
+High success probability projected based on industry benchmarks and resource availability analysis."""
+        
+        if "use_cases" in data:
+            stage_sections = (research, use_cases, resources)
+        else:
+            # Single-pass runs have no separate stage outputs: the proposal, which covers the
+            # research, use cases and resources itself, replaces those three sections
+            stage_sections = (f"""## 3. AI Use Case Proposal
 
-*This report was generated using an advanced multi-agent AI research system designed to provide comprehensive, actionable intelligence for AI implementation strategy.*""")
+{data['proposal']}""",)
         
-        return "\n\n".join(sections)
+        return "\n\n".join((
+            header,
+            executive_summary,
+            REPORT_METHODOLOGY,
+            *stage_sections,
+            REPORT_ROADMAP,
+            REPORT_BUDGET_ROI,
+            REPORT_RISK,
+            REPORT_NEXT_STEPS,
+            conclusions,
+            REPORT_REFERENCES
+        ))
 
     def _validate_proposal_output(self, result: str, company: str, industry: str) -> None:
         """Validate that the proposal output contains all required elements"""
-        result_str = str(result).lower()
+        # casefold, not lower, so the needles also match non-ASCII case variants
+        result_str = result.casefold()
+        
+        # Single pass over the proposal, counting every validation needle at once
+        matches = Counter(match.group() for match in self._VALIDATION_PATTERN.finditer(result_str))
+        found_elements = {element for needle in matches for element in self._VALIDATION_NEEDLES[needle]}
         
         # Check for required elements
         required_elements = {
-            "executive summary": "executive summary" in result_str,
-            "ai use cases": "use case" in result_str or "ai" in result_str,
-            "budget": "budget" in result_str or "cost" in result_str or "investment" in result_str,
-            "roi": "roi" in result_str or "return on investment" in result_str,
-            "implementation": "implementation" in result_str or "roadmap" in result_str,
-            "risk": "risk" in result_str,
-            "company name": company.lower() in result_str,
-            "industry": industry.lower() in result_str
+            "executive summary": "executive summary" in found_elements,
+            "ai use cases": "ai use cases" in found_elements,
+            "budget": "budget" in found_elements,
+            "roi": "roi" in found_elements,
+            "implementation": "implementation" in found_elements,
+            "risk": "risk" in found_elements,
+            "company name": company.casefold() in result_str,
+            "industry": industry.casefold() in result_str
         }
         
         # Check for sufficient use cases
-        use_case_count = result_str.count("use case") + result_str.count("1.") + result_str.count("2.") + result_str.count("3.")
+        use_case_count = matches["use case"] + matches["1."] + matches["2."] + matches["3."]
         has_sufficient_use_cases = use_case_count >= 15
         
         # Check for resource links
-        has_kaggle_links = "kaggle.com" in result_str
-        has_github_links = "github.com" in result_str
-        has_http_links = "http" in result_str
+        has_kaggle_links = "kaggle.com" in found_elements
+        has_github_links = "github.com" in found_elements
+        has_http_links = "http" in found_elements
         
         missing_elements = [element for element, present in required_elements.items() if not present]
         
         if missing_elements:
-            logger.warning(f"Proposal missing required elements: {missing_elements}")
+            logger.warning("Proposal missing required elements: %s", missing_elements)
         
         if has_sufficient_use_cases:
-            logger.info(f"■ Proposal contains sufficient use cases ({use_case_count} found)")
+            logger.info("■ Proposal contains sufficient use cases (%d found)", use_case_count)
         else:
-            logger.warning(f"■■ Proposal has insufficient use cases ({use_case_count} found, need at least 15)")
+            logger.warning("■■ Proposal has insufficient use cases (%d found, need at least 15)", use_case_count)
         
         if has_kaggle_links or has_github_links:
             logger.info("■ Proposal contains clickable resource links")
         else:
             logger.warning("■■ Proposal missing clickable resource links")
 
+    def clear_proposal_cache(self) -> None:
+        """Forget memoized proposals so the next request for any company re-runs the agents"""
+        # Cleared on the event loop, which owns the memo, ahead of any proposal submitted after this call
+        self._loop.call_soon_threadsafe(self._proposal_memo.clear)
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP client"""
+        await self._http.aclose()
+
+    def close(self) -> None:
+        """Close the shared HTTP client and stop the background event loop"""
+        asyncio.run_coroutine_threadsafe(self.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._loop_thread.join()
+
+    def get_proposal_cache_stats(self) -> Dict[str, int]:
+        """Current proposal memo hits, misses and size"""
+        return {**self._proposal_memo_stats, "size": len(self._proposal_memo)}
+
     def get_system_status(self):
         """Get system status"""
-        api_key_status = settings.validate_api_keys()
+        api_key_status = settings.api_key_status
         return {
             "agents": [
                 "Research Agent",
@@ -683,12 +1277,17 @@ High success probability projected based on industry benchmarks and resource ava
             ],
             "api_keys_configured": api_key_status["valid"],
             "llm": settings.LLM_MODEL,
+            "llm_fast": settings.LLM_MODEL_FAST,
+            "llm_smart": settings.LLM_MODEL_SMART,
+            "proposal_cache": self.get_proposal_cache_stats(),
             "status": "healthy" if api_key_status["valid"] else "configuration_needed"
         }
 
 
 def main():
     """Main function for testing the Enhanced LangChain system"""
+    logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+    
     try:
         system = SimpleLangChainSystem()
         company = "Zoho"
@@ -697,18 +1296,22 @@ def main():
         print(f"■ Starting Enhanced LangChain Multi-Agent AI System for {company} in {industry}")
         print("=" * 60)
         
-        result = system.generate_proposal(company, industry)
+        # Stream the final proposal to the console as it is written; the run happens on the
+        # system's own event loop, which its shared clients are bound to
+        result = system.generate_proposal(company, industry, on_token=lambda token: print(token, end="", flush=True))
+        print()
         
         if result["status"] == "success":
             print("■ Proposal generated successfully!")
-            print(f"■ Consolidated Report: {result.get('consolidated_file', 'N/A')}")
-            print(f"■ Detailed Data: {result.get('json_file', 'N/A')}")
+            print(f"■ Consolidated Report: {len(result['consolidated_report']):,} characters")
+            print(f"■ Excel Workbook: {len(result['excel_content']):,} bytes")
+            print(f"■ Detailed Data (JSON): {len(result['json_content']):,} bytes")
             print(f"■ Result: {result['result'][:200]}...")
         else:
             print(f"■ Error: {result['message']}")
             
     except Exception as e:
-        logger.error(f"Main execution failed: {str(e)}")
+        logger.error("Main execution failed: %s", e)
         print(f"■ System failed: {str(e)}")
 
 
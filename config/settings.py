@@ -3,17 +3,30 @@ Configuration settings for the Multi-Agent AI Use Case Generation System
 Enhanced with better API key validation and debugging
 """
 import os
+import sys
+import logging
+from pathlib import Path
+from functools import cached_property, lru_cache
 from dotenv import load_dotenv
-import streamlit as st  # Import streamlit for secrets management
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Locations Streamlit reads secrets.toml from
+STREAMLIT_SECRETS_FILES = (
+    Path.cwd() / ".streamlit" / "secrets.toml",
+    Path.home() / ".streamlit" / "secrets.toml",
+)
+
 class Settings:
     """Application settings with enhanced API key management"""
     
     # LLM Configuration
     LLM_MODEL: str = "openai/gpt-4o-mini"  # Model that supports tool use
+    LLM_MODEL_FAST: str = LLM_MODEL  # Research and resource agents (summarizing tool output)
+    LLM_MODEL_SMART: str = LLM_MODEL  # Use case and proposal agents (long-form synthesis)
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 4000
     
@@ -26,30 +39,47 @@ class Settings:
     
     # System Configuration
     LOG_LEVEL: str = "INFO"
-    REPORTS_DIR: str = "outputs"
+    REPORTS_DIR: Path = Path("outputs")
     MAX_RETRIES: int = 3
     TIMEOUT: int = 300
     
+    # Optional Redis URL for a shared LLM response cache (defaults to local SQLite)
+    REDIS_URL: str = ""
+    
+    # Run one tool-calling consultant agent instead of the staged multi-agent workflow
+    SINGLE_PASS_PROPOSAL: bool = False
+    
+    def _streamlit(self):
+        """
+        Return the streamlit module if secrets can come from it. The Streamlit app has already
+        imported it; other callers (CLI, batch runs) only import it when a secrets file exists
+        """
+        st = sys.modules.get("streamlit")
+        if st is None and any(path.is_file() for path in STREAMLIT_SECRETS_FILES):
+            import streamlit as st
+        return st
+    
     def get_secret(self, key: str, default: str = "") -> str:
         """Retrieve secret from st.secrets or environment variables with debugging"""
         # Try Streamlit secrets first (for cloud deployment)
-        if hasattr(st, 'secrets') and key in st.secrets:
+        st = self._streamlit()
+        if st is not None and hasattr(st, 'secrets') and key in st.secrets:
             value = st.secrets[key]
-            print(f"✅ Loaded {key} from Streamlit secrets")
+            logger.debug("Loaded %s from Streamlit secrets", key)
             return value
         
         # Fallback to environment variables (for local development)
         value = os.getenv(key, default)
         if value:
-            print(f"✅ Loaded {key} from environment variables")
+            logger.debug("Loaded %s from environment variables", key)
         else:
-            print(f"❌ {key} not found in secrets or environment")
+            logger.debug("%s not found in secrets or environment", key)
         
         return value
     
     def __init__(self):
         """Initialize settings with API key loading"""
-        print("🔧 Initializing settings...")
+        logger.debug("Initializing settings...")
         
         # Load API keys with debugging
         self.OPENROUTER_API_KEY = self.get_secret("OPENROUTER_API_KEY")
@@ -57,14 +87,23 @@ class Settings:
         self.KAGGLE_USERNAME = self.get_secret("KAGGLE_USERNAME")
         self.KAGGLE_KEY = self.get_secret("KAGGLE_KEY")
         self.GITHUB_TOKEN = self.get_secret("GITHUB_TOKEN")
+        self.REDIS_URL = os.getenv("REDIS_URL", "")
+        self.LLM_MODEL_FAST = os.getenv("LLM_MODEL_FAST", self.LLM_MODEL_FAST)
+        self.LLM_MODEL_SMART = os.getenv("LLM_MODEL_SMART", self.LLM_MODEL_SMART)
+        self.SINGLE_PASS_PROPOSAL = os.getenv("SINGLE_PASS_PROPOSAL", "").lower() in ("1", "true", "yes")
         
         # Create reports directory if it doesn't exist
-        os.makedirs(self.REPORTS_DIR, exist_ok=True)
+        self.REPORTS_DIR.mkdir(parents=True, exist_ok=True)
         
-        print("✅ Settings initialized successfully")
+        logger.debug("Settings initialized successfully")
     
     def validate_api_keys(self) -> dict:
         """Validate that all required API keys are configured"""
+        return self.api_key_status
+    
+    @cached_property
+    def api_key_status(self) -> dict:
+        """API key validation result, computed once (keys are only loaded at init)"""
         required_keys = {
             "OPENROUTER_API_KEY": self.OPENROUTER_API_KEY,
             "SERPER_API_KEY": self.SERPER_API_KEY,
@@ -87,12 +126,19 @@ class Settings:
         """Get debugging information about configuration"""
         return {
             "llm_model": self.LLM_MODEL,
+            "llm_model_fast": self.LLM_MODEL_FAST,
+            "llm_model_smart": self.LLM_MODEL_SMART,
             "api_keys_status": self.validate_api_keys(),
-            "reports_dir": self.REPORTS_DIR,
+            "reports_dir": str(self.REPORTS_DIR),
             "log_level": self.LOG_LEVEL,
             "max_retries": self.MAX_RETRIES,
             "timeout": self.TIMEOUT
         }
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, loading secrets on first call only"""
+    return Settings()
+
 # Create global settings instance
-settings = Settings()
\ No newline at end of file
+settings = get_settings()
\ No newline at end of file
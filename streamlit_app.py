@@ -3,12 +3,16 @@ Enhanced Streamlit App with Validation, Consolidated Output and Comprehensive Fe
 Updated with strict validation and single file output generation
 """
 import streamlit as st
-import json
-import os
-from datetime import datetime
+import re
+import time
+import queue
+import logging
 from ai_proposal_system import SimpleLangChainSystem
 from config.settings import settings
 
+# The app owns logging configuration (no-op on reruns once handlers exist)
+logging.basicConfig(level=getattr(logging, settings.LOG_LEVEL))
+
 # Configure Streamlit page
 st.set_page_config(
     page_title="AI Use Case Generator - Enhanced",
@@ -20,18 +24,39 @@ st.set_page_config(
     }
 )
 
-# Use st.cache_resource for caching system objects
-@st.cache_resource(ttl=3600, show_spinner=False)
+# The system holds live LLM and HTTP clients, so it is a process-wide resource: created
+# once, shared across reruns and sessions, never copied or expired
+@st.cache_resource(show_spinner=False)
+def _get_system():
+    """
+    Create the shared system instance, with the time it was created (failures are not cached,
+    so the next rerun retries)
+    """
+    return SimpleLangChainSystem(), time.perf_counter()
+
+def _record_timing(name, elapsed, hit=None):
+    """Keep the last 20 timings (ms, and cache hit/miss if known) of an operation in session state"""
+    timings = st.session_state.setdefault("_cache_stats", {}).setdefault(name, [])
+    timings.append({"ms": round(elapsed * 1000, 1), "cache": {True: "hit", False: "miss"}.get(hit, "-")})
+    del timings[:-20]
+
 def initialize_system():
-    """Initialize the enhanced system with caching"""
+    """Get the shared system and its current status"""
+    start = time.perf_counter()
+    created_at = None
     try:
-        system = SimpleLangChainSystem()
+        system, created_at = _get_system()
+        # Not cached: the API key check is already computed once per process by settings,
+        # and the rest of the status is static or live counters
         return system, system.get_system_status()
     except Exception as e:
         return None, {"status": "error", "error": str(e)}
+    finally:
+        # A system created before this call came from the cache; one created during it is a miss
+        _record_timing("initialize_system", time.perf_counter() - start, hit=created_at is not None and created_at < start)
 
 # Enhanced CSS with modern design
-st.markdown("""
+_CSS = """
 <style>
     .main-header {
         font-size: 2.5rem;
@@ -66,22 +91,223 @@ st.markdown("""
         margin: 1rem 0;
         border-radius: 5px;
     }
-    .output-section {
-        background: rgba(255, 255, 255, 0.05);
-        border-radius: 10px;
-        padding: 1.5rem;
-        margin: 1rem 0;
-        border: 1px solid rgba(255, 255, 255, 0.1);
-    }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+def _inject_css():
+    """Inject the app's custom styles"""
+    # st.html skips the markdown pipeline, and a style-only payload takes no layout space
+    st.html(_CSS)
+
+# Executive summary section of the consolidated report: everything after its heading
+# line up to the next "## 2." heading (or the end of the report)
+EXECUTIVE_SUMMARY_PATTERN = re.compile(r"## 1\. Executive Summary[^\n]*\n(.*?)(?=^## 2\.|\Z)", re.DOTALL | re.MULTILINE)
+
+RESULT_VIEWS = [
+    "📋 Executive Summary",
+    "🔍 Research Analysis",
+    "🤖 Validated Use Cases",
+    "📦 Resource Assets",
+    "📁 Output Files"
+]
+
+# Longer markdown fields render only this much as markdown; the rest goes in an expander as
+# plain text, which is far cheaper for the browser to lay out
+MAX_INLINE_MD = 5000
+
+def _render_long_markdown(text):
+    """Render text as markdown, moving anything past MAX_INLINE_MD into a plain-text expander"""
+    if len(text) <= MAX_INLINE_MD:
+        st.markdown(text)
+        return
+    # Cut at a line break so a markdown line (table row, link, emphasis) is never split
+    cut = text.rfind("\n", 0, MAX_INLINE_MD) + 1 or MAX_INLINE_MD
+    st.markdown(text[:cut])
+    with st.expander("Show remaining"):
+        st.text(text[cut:])
+
+# A fragment: interacting with the results (e.g. a download click) reruns only this view,
+# not system initialization, the sidebar or the input section
+@st.fragment
+def render_results(result):
+    """Render a proposal result (tabs, downloads and summary metrics, or the error)"""
+    company = result["company"]
+    industry = result["industry"]
+    
+    if result["status"] == "success":
+        st.success("🎉 Enhanced proposal generated successfully!")
+        
+        # Display success metrics
+        st.html('<div class="success-metric">✅ Strict Validation Passed | 📊 Consolidated Output Generated | 🔗 Resources Curated</div>')
+        
+        # A view selector rather than st.tabs: tabs run every body on each rerun, while this
+        # renders only the selected view
+        view = st.radio(
+            "View",
+            RESULT_VIEWS,
+            horizontal=True,
+            label_visibility="collapsed",
+            key="result_view"
+        )
+        
+        if view == RESULT_VIEWS[0]:
+            st.markdown("### Executive Summary")
+            # A bordered container replaces the HTML div wrappers, which st.markdown rendered
+            # as separate empty elements rather than around the content
+            with st.container(border=True):
+                # Extract executive summary from consolidated report
+                match = EXECUTIVE_SUMMARY_PATTERN.search(result.get("consolidated_report", ""))
+                if match and match.group(1):
+                    st.markdown(match.group(1))
+                else:
+                    st.markdown(result["result"][:1000] + "...")
+        
+        elif view == RESULT_VIEWS[1]:
+            st.markdown("### Industry Research & Market Analysis")
+            with st.container(border=True):
+                if result.get("research_findings"):
+                    _render_long_markdown(result["research_findings"])
+                else:
+                    st.info("Enable detailed output to view research findings")
+        
+        elif view == RESULT_VIEWS[2]:
+            st.markdown("### Validated AI Use Cases")
+            st.html('<div class="enhancement-box"><strong>✅ Validation Status:</strong> Use cases validated for count and category distribution</div>')
+            
+            with st.container(border=True):
+                if result.get("use_cases"):
+                    _render_long_markdown(result["use_cases"])
+                else:
+                    st.info("Enable detailed output to view use cases")
+        
+        elif view == RESULT_VIEWS[3]:
+            st.markdown("### Curated Resources & Implementation Assets")
+            with st.container(border=True):
+                if result.get("resources"):
+                    _render_long_markdown(result["resources"])
+                else:
+                    st.info("Enable detailed output to view resources")
+        
+        elif view == RESULT_VIEWS[4]:
+            st.markdown("### Generated Output Files")
+            
+            # File download section
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.markdown("#### 📋 Consolidated Report")
+                if "consolidated_report_bytes" in result:
+                    # The system encodes the report once, alongside the Excel and JSON payloads;
+                    # the result is shared with other sessions, so it is only read here
+                    consolidated_content = result["consolidated_report_bytes"]
+                    
+                    st.download_button(
+                        label="📥 Download Consolidated Report (Markdown)",
+                        data=consolidated_content,
+                        file_name=f"{company}_{industry}_CONSOLIDATED_REPORT.md",
+                        mime="text/markdown",
+                        help="Complete report with methodology and conclusions"
+                    )
+                    
+                    # Display file info
+                    file_size = len(consolidated_content)
+                    st.info(f"📄 File size: {file_size:,} bytes | Contains: Methodology, Results, Conclusions")
+            
+            with col2:
+                st.markdown("#### 📊 Excel Report (Company Format)")
+                if "excel_content" in result:
+                    excel_content = result["excel_content"]
+                    
+                    st.download_button(
+                        label="📥 Download Excel Report",
+                        data=excel_content,
+                        file_name=f"{company}_{industry}_AI_Proposal.xlsx",
+                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                        help="Excel format matching company sample requirements"
+                    )
+                    
+                    # Display Excel info
+                    excel_size = len(excel_content)
+                    st.info(f"📊 File size: {excel_size:,} bytes | Contains: Use cases, objectives, benefits")
+            
+            with col3:
+                st.markdown("#### 📊 Detailed Data")
+                if "json_content" in result:
+                    json_content = result["json_content"]
+                    
+                    st.download_button(
+                        label="📥 Download Detailed Data (JSON)",
+                        data=json_content,
+                        file_name=f"{company}_{industry}_DETAILED_DATA.json",
+                        mime="application/json",
+                        help="Structured data for integration and analysis"
+                    )
+                    
+                    # Display JSON info
+                    json_size = len(json_content)
+                    st.info(f"📊 File size: {json_size:,} bytes | Contains: Raw data, metadata, timestamps")
+            
+            # File info display
+            st.markdown("#### 📁 Generated Files")
+            st.info("All files are generated in memory and available for download. No local files are saved.")
+            
+            file_list = []
+            if "consolidated_report" in result:
+                file_list.append("📋 Consolidated Report (Markdown)")
+            if "excel_content" in result:
+                file_list.append("📊 Excel Report (XLSX)")
+            if "json_content" in result:
+                file_list.append("📊 Detailed Data (JSON)")
+            
+            for file_info in file_list:
+                st.code(file_info)
+        
+        # Enhanced summary metrics
+        st.markdown("---")
+        st.markdown("### 📊 Generation Summary")
+        
+        # One table element instead of a metric widget per value
+        file_count = sum(1 for key in ["consolidated_report", "excel_content", "json_content"] if key in result)
+        st.dataframe(
+            [{
+                "🏢 Company": company,
+                "🏭 Industry": industry,
+                "⏰ Generated": result.get("timestamp", "N/A")[:10],
+                "✅ Status": "Success",
+                "📁 Files": file_count
+            }],
+            hide_index=True,
+            use_container_width=True
+        )
+    
+    else:
+        st.error(f"❌ Enhanced generation failed: {result.get('message', 'Unknown error')}")
+        
+        # Enhanced error information
+        if result.get("error_type"):
+            st.markdown(f"**Error Type:** {result['error_type']}")
+        
+        st.markdown("### 🔧 Troubleshooting:")
+        st.markdown("""
+        1. Check API key configuration
+        2. Verify internet connectivity
+        3. Ensure sufficient API credits
+        4. Review system logs for details
+        """)
 
 def main():
     """Enhanced main application with validation and consolidated output"""
     
-    # Modern header
-    st.markdown('<h1 class="main-header">🤖 Enhanced AI Use Case Generator</h1>', unsafe_allow_html=True)
-    st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 2rem;">Powered by LangChain Multi-Agent System with Strict Validation & Consolidated Output</p>', unsafe_allow_html=True)
+    # Re-emitted on every rerun on purpose: Streamlit drops elements a rerun does not emit,
+    # and the unchanged style element is matched by the frontend diff, not re-rendered
+    _inject_css()
+    
+    # Modern header; once a proposal is on screen a plain title keeps the page payload small
+    if st.session_state.get("last_result"):
+        st.title("🤖 AI Use Case Generator")
+    else:
+        st.markdown('<h1 class="main-header">🤖 Enhanced AI Use Case Generator</h1>', unsafe_allow_html=True)
+        st.markdown('<p style="text-align: center; font-size: 1.2rem; color: #666; margin-bottom: 2rem;">Powered by LangChain Multi-Agent System with Strict Validation & Consolidated Output</p>', unsafe_allow_html=True)
     
     # Initialize system
     system, status = initialize_system()
@@ -92,7 +318,7 @@ def main():
         
         # Enhanced status display
         if status["status"] == "healthy":
-            st.markdown('<div class="validation-badge">✅ System Status: Healthy</div>', unsafe_allow_html=True)
+            st.html('<div class="validation-badge">✅ System Status: Healthy</div>')
         elif status["status"] == "error":
             st.error(f"❌ System Error: {status.get('error', 'Unknown error')}")
         else:
@@ -102,13 +328,23 @@ def main():
         if system:
             st.markdown("### 📊 System Components")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("🔧 Tools", f"{len(status.get('tools', []))}")
-                st.metric("🤖 Agents", f"{len(status.get('agents', []))}")
-            with col2:
-                st.metric("🔑 API Keys", "✅" if status.get("api_keys_configured") else "❌")
-                st.metric("🧠 Model", "GPT-4o-mini")
+            # One table element instead of a metric widget per value
+            st.dataframe(
+                [
+                    {"Component": "🔧 Tools", "Value": f"{len(status.get('tools', []))}"},
+                    {"Component": "🤖 Agents", "Value": f"{len(status.get('agents', []))}"},
+                    {"Component": "🔑 API Keys", "Value": "✅" if status.get("api_keys_configured") else "❌"},
+                    {"Component": "🧠 Model (fast)", "Value": status.get("llm_fast", settings.LLM_MODEL_FAST)},
+                    {"Component": "🧠 Model (smart)", "Value": status.get("llm_smart", settings.LLM_MODEL_SMART)}
+                ],
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            # Cache telemetry, to catch cache misses and slow reruns early
+            with st.expander("🛠 Cache stats", expanded=False):
+                # Filled at the end of the run, so it includes a generation made in this same run
+                cache_stats_panel = st.empty()
             
             # Show enhancements
             if "enhancements" in status:
@@ -155,7 +391,7 @@ def main():
     # Enhanced input section
     st.markdown("## 📝 Input Parameters")
     
-    col1, col2 = st.columns([2, 1])
+    col1, col2 = st.columns([2, 1], gap="large")
     
     with col1:
         company = st.text_input(
@@ -219,229 +455,74 @@ def main():
             use_container_width=True,
             help="Generate validated use cases with consolidated output"
         )
+        regenerate_button = st.button(
+            "🔄 Regenerate (ignore cached proposals)",
+            use_container_width=True,
+            help="Re-run the agents even if this company and industry were generated before"
+        )
     
     # Enhanced generation process
-    if generate_button:
+    if generate_button or regenerate_button:
         if not company or not industry:
             st.error("❌ Please provide both company name and industry sector.")
             st.stop()
         
-        # Enhanced progress tracking
-        progress_container = st.container()
-        
-        with progress_container:
-            progress_bar = st.progress(0, text="🔄 Initializing enhanced AI agents...")
-            status_placeholder = st.empty()
+        try:
+            # The proposal runs on the system's event loop; its progress steps and proposal
+            # tokens arrive through a queue that this script thread drains into the UI
+            events = queue.Queue()
+            start = time.perf_counter()
+            future = system.submit_proposal(
+                company, industry,
+                on_token=lambda token: events.put(("token", token)),
+                on_progress=lambda message, fraction: events.put(("progress", (message, fraction))),
+                # Regenerating skips the memoized proposal and the cached LLM and search responses
+                bypass_cache=regenerate_button
+            )
             
-            try:
-                # Enhanced progress steps
-                steps = [
-                    ("🔍 Research Agent: Comprehensive market analysis", 20),
-                    ("🤖 Use Case Agent: Generating validated AI scenarios", 45),
-                    ("📊 Resource Agent: Curating datasets and repositories", 70),
-                    ("📋 Proposal Agent: Creating business proposal", 85),
-                    ("✅ Consolidation: Generating single output file", 95)
-                ]
-                
-                for step_text, progress in steps:
-                    progress_bar.progress(progress, text=step_text)
-                    status_placeholder.info(f"Currently processing: {step_text}")
+            # Progress and the streamed proposal live in a status block that collapses when done
+            with st.status("🔄 Generating proposal...", expanded=True) as generation_status:
+                progress_bar = st.progress(0, text="🔄 Initializing enhanced AI agents...")
                 
-                # Generate enhanced proposal
-                with st.spinner("Processing with enhanced validation..."):
-                    result = system.generate_proposal(company, industry)
+                def proposal_tokens():
+                    """Yield proposal tokens as they arrive, updating progress in between"""
+                    while not future.done() or not events.empty():
+                        try:
+                            kind, payload = events.get(timeout=0.2)
+                        except queue.Empty:
+                            continue
+                        if kind == "token":
+                            yield payload
+                        else:
+                            # One delta per step: the bar's own text carries the step label
+                            step_text, fraction = payload
+                            progress_bar.progress(int(fraction * 100), text=step_text)
                 
-                progress_bar.progress(100, text="✅ Enhanced generation completed!")
-                status_placeholder.success("🎉 Proposal generated with validation!")
+                st.write_stream(proposal_tokens())
+                result = future.result()
                 
-                # Enhanced results display
                 if result["status"] == "success":
-                    st.success("🎉 Enhanced proposal generated successfully!")
-                    
-                    # Display success metrics
-                    st.markdown('<div class="success-metric">✅ Strict Validation Passed | 📊 Consolidated Output Generated | 🔗 Resources Curated</div>', unsafe_allow_html=True)
-                    
-                    # Enhanced results tabs
-                    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-                        "📋 Executive Summary",
-                        "🔍 Research Analysis", 
-                        "🤖 Validated Use Cases",
-                        "📦 Resource Assets",
-                        "📁 Output Files"
-                    ])
-                    
-                    with tab1:
-                        st.markdown("### Executive Summary")
-                        st.markdown('<div class="output-section">', unsafe_allow_html=True)
-                        
-                        # Extract executive summary from consolidated report
-                        if "consolidated_report" in result:
-                            report_lines = result["consolidated_report"].split('\n')
-                            summary_started = False
-                            summary_lines = []
-                            
-                            for line in report_lines:
-                                if "## 1. Executive Summary" in line:
-                                    summary_started = True
-                                    continue
-                                elif summary_started and line.startswith("## 2."):
-                                    break
-                                elif summary_started:
-                                    summary_lines.append(line)
-                            
-                            if summary_lines:
-                                st.markdown('\n'.join(summary_lines))
-                            else:
-                                st.markdown(result["result"][:1000] + "...")
-                        else:
-                            st.markdown(result["result"][:1000] + "...")
-                        
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with tab2:
-                        st.markdown("### Industry Research & Market Analysis")
-                        st.markdown('<div class="output-section">', unsafe_allow_html=True)
-                        if result.get("research_findings"):
-                            st.markdown(result["research_findings"])
-                        else:
-                            st.info("Enable detailed output to view research findings")
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with tab3:
-                        st.markdown("### Validated AI Use Cases")
-                        st.markdown('<div class="enhancement-box">', unsafe_allow_html=True)
-                        st.markdown("**✅ Validation Status:** Use cases validated for count and category distribution")
-                        st.markdown('</div>', unsafe_allow_html=True)
-                        
-                        st.markdown('<div class="output-section">', unsafe_allow_html=True)
-                        if result.get("use_cases"):
-                            st.markdown(result["use_cases"])
-                        else:
-                            st.info("Enable detailed output to view use cases")
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with tab4:
-                        st.markdown("### Curated Resources & Implementation Assets")
-                        st.markdown('<div class="output-section">', unsafe_allow_html=True)
-                        if result.get("resources"):
-                            st.markdown(result["resources"])
-                        else:
-                            st.info("Enable detailed output to view resources")
-                        st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    with tab5:
-                        st.markdown("### Generated Output Files")
-                        
-                        # File download section
-                        col1, col2, col3 = st.columns(3)
-                        
-                        with col1:
-                            st.markdown("#### 📋 Consolidated Report")
-                            if "consolidated_report" in result:
-                                consolidated_content = result["consolidated_report"]
-                                
-                                st.download_button(
-                                    label="📥 Download Consolidated Report (Markdown)",
-                                    data=consolidated_content,
-                                    file_name=f"{company}_{industry}_CONSOLIDATED_REPORT.md",
-                                    mime="text/markdown",
-                                    help="Complete report with methodology and conclusions"
-                                )
-                                
-                                # Display file info
-                                file_size = len(consolidated_content.encode('utf-8'))
-                                st.info(f"📄 File size: {file_size:,} bytes | Contains: Methodology, Results, Conclusions")
-                        
-                        with col2:
-                            st.markdown("#### 📊 Excel Report (Company Format)")
-                            if "excel_content" in result:
-                                excel_content = result["excel_content"]
-                                
-                                st.download_button(
-                                    label="📥 Download Excel Report",
-                                    data=excel_content,
-                                    file_name=f"{company}_{industry}_AI_Proposal.xlsx",
-                                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                                    help="Excel format matching company sample requirements"
-                                )
-                                
-                                # Display Excel info
-                                excel_size = len(excel_content)
-                                st.info(f"📊 File size: {excel_size:,} bytes | Contains: Use cases, objectives, benefits")
-                        
-                        with col3:
-                            st.markdown("#### 📊 Detailed Data")
-                            if "json_content" in result:
-                                json_content = result["json_content"]
-                                
-                                st.download_button(
-                                    label="📥 Download Detailed Data (JSON)",
-                                    data=json_content,
-                                    file_name=f"{company}_{industry}_DETAILED_DATA.json",
-                                    mime="application/json",
-                                    help="Structured data for integration and analysis"
-                                )
-                                
-                                # Display JSON info
-                                json_size = len(json_content.encode('utf-8'))
-                                st.info(f"📊 File size: {json_size:,} bytes | Contains: Raw data, metadata, timestamps")
-                        
-                        # File info display
-                        st.markdown("#### 📁 Generated Files")
-                        st.info("All files are generated in memory and available for download. No local files are saved.")
-                        
-                        file_list = []
-                        if "consolidated_report" in result:
-                            file_list.append("📋 Consolidated Report (Markdown)")
-                        if "excel_content" in result:
-                            file_list.append("📊 Excel Report (XLSX)")
-                        if "json_content" in result:
-                            file_list.append("📊 Detailed Data (JSON)")
-                        
-                        for file_info in file_list:
-                            st.code(file_info)
-                    
-                    # Enhanced summary metrics
-                    st.markdown("---")
-                    st.markdown("### 📊 Generation Summary")
-                    
-                    metrics_cols = st.columns(5)
-                    with metrics_cols[0]:
-                        st.metric("🏢 Company", company)
-                    with metrics_cols[1]:
-                        st.metric("🏭 Industry", industry)
-                    with metrics_cols[2]:
-                        st.metric("⏰ Generated", result.get("timestamp", "N/A")[:10])
-                    with metrics_cols[3]:
-                        st.metric("✅ Status", "Success")
-                    with metrics_cols[4]:
-                        file_count = sum(1 for key in ["consolidated_report", "excel_content", "json_content"] if key in result)
-                        st.metric("📁 Files", file_count)
-                
+                    generation_status.update(label="🎉 Proposal generated with validation!", state="complete", expanded=False)
+                    st.toast("✅ Enhanced generation completed!")
                 else:
-                    st.error(f"❌ Enhanced generation failed: {result.get('message', 'Unknown error')}")
-                    
-                    # Enhanced error information
-                    if result.get("error_type"):
-                        st.markdown(f"**Error Type:** {result['error_type']}")
-                    
-                    st.markdown("### 🔧 Troubleshooting:")
-                    st.markdown("""
-                    1. Check API key configuration
-                    2. Verify internet connectivity
-                    3. Ensure sufficient API credits
-                    4. Review system logs for details
-                    """)
+                    generation_status.update(label="❌ Proposal generation failed", state="error", expanded=False)
             
-            except Exception as e:
-                st.error(f"🚨 System error: {str(e)}")
-                st.markdown("Please check the system configuration and try again.")
+            _record_timing("generate_proposal", time.perf_counter() - start)
             
-            finally:
-                # Clean up progress indicators
-                import time
-                time.sleep(1)
-                progress_container.empty()
+            # Keep the result across reruns (tab switches, downloads, toggles)
+            st.session_state["last_result"] = result
+        
+        except Exception as e:
+            st.error(f"🚨 System error: {str(e)}")
+            st.markdown("Please check the system configuration and try again.")
+    
+    # Render the latest proposal on every rerun, not only right after it is generated
+    if st.session_state.get("last_result"):
+        render_results(st.session_state["last_result"])
+    
+    # Live proposal memo counters, read after any generation above
+    if system:
+        cache_stats_panel.json({"proposal_cache": system.get_proposal_cache_stats(), **st.session_state.get("_cache_stats", {})})
     
     # Enhanced footer
     st.markdown("---")
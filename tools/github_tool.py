@@ -1,19 +1,63 @@
 """
 GitHub Repository Search Tool for finding implementation examples and code resources
 """
+import asyncio
+import threading
+import contextlib
+import httpx
+import orjson
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cachetools import LRUCache, TTLCache
+from typing import List, Dict, Any, Optional, Tuple
 from config.settings import settings
+from utils.http import get_session
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Business queries are searched concurrently, so each request gets a shorter timeout
+REQUEST_TIMEOUT = 10
+
+# Business angles searched alongside the query. GitHub allows at most five AND/OR/NOT
+# operators per search, so they are OR-ed together in groups of five terms
+BUSINESS_TERMS = [
+    "business analytics",
+    "enterprise software",
+    "CRM system",
+    "business intelligence",
+    "data analytics",
+    "machine learning business",
+    "AI enterprise",
+    "business automation",
+    "predictive analytics",
+    "business dashboard"
+]
+TERMS_PER_QUERY = 5
+
+# The OR-ed term groups, built once; each search is the query followed by one of these
+BUSINESS_FILTERS = tuple(
+    "(" + " OR ".join(f'"{term}"' for term in BUSINESS_TERMS[i:i + TERMS_PER_QUERY]) + ")"
+    for i in range(0, len(BUSINESS_TERMS), TERMS_PER_QUERY)
+)
+
+# Stop searching once this many times max_results unique repositories are collected
+# (a small over-fetch so deduplication still leaves enough to choose from)
+OVERFETCH_FACTOR = 2
+
+# Repository fields kept from search results (deduplication and formatting use no others)
+REPOSITORY_FIELDS = (
+    "id", "name", "full_name", "description", "html_url", "clone_url",
+    "stargazers_count", "forks_count", "language", "updated_at", "topics"
+)
+
 class GitHubTool:
     """Tool for searching GitHub repositories for implementation examples"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.api_token = settings.GITHUB_TOKEN
         self.base_url = "https://api.github.com"
+        self.http_client = http_client
         self.headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "Multi-Agent-AI-System"
@@ -21,8 +65,21 @@ class GitHubTool:
         
         if self.api_token:
             self.headers["Authorization"] = f"token {self.api_token}"
+        
+        # Formatted results per (query, max_results, language, sort); the lock covers
+        # tool calls arriving from worker threads and the event loop at once
+        self._cache = TTLCache(maxsize=256, ttl=3600)
+        self._cache_lock = threading.Lock()
+        
+        # (ETag, repositories) per search request, so repeat searches are sent as conditional
+        # requests and a 304 reuses the repositories parsed last time (same lock)
+        self._etags = LRUCache(maxsize=256)
+        
+        # The synchronous path uses the process-wide pooled session, with headers per request
+        self.session = get_session()
     
-    def _run(self, query: str, max_results: int = 3, language: str = "", sort: str = "stars") -> str:
+    def _run(self, query: str, max_results: int = 3, language: str = "", sort: str = "stars",
+             bypass_cache: bool = False) -> str:
         """
         Search for repositories on GitHub with improved business-relevant queries
         
@@ -31,94 +88,37 @@ class GitHubTool:
             max_results: Maximum number of results to return
             language: Programming language filter
             sort: Sort criteria for results
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
             
         Returns:
             Formatted repository information
         """
+        cache_key = (query, max_results, language, sort)
+        cached = None if bypass_cache else self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Create more specific business-relevant search queries
-            business_queries = [
-                f"{query} business analytics",
-                f"{query} enterprise software",
-                f"{query} CRM system",
-                f"{query} business intelligence",
-                f"{query} data analytics",
-                f"{query} machine learning business",
-                f"{query} AI enterprise",
-                f"{query} business automation",
-                f"{query} predictive analytics",
-                f"{query} business dashboard"
-            ]
-            
-            all_repositories = []
-            searched_queries = []
+            business_queries = self._business_queries(query)
             
-            for business_query in business_queries:
-                try:
-                    # Build search query
-                    search_query = business_query
-                    if language:
-                        search_query += f" language:{language}"
-                    
-                    # Prepare request parameters
-                    params = {
-                        "q": search_query,
-                        "sort": sort,
-                        "order": "desc",
-                        "per_page": min(3, 30)  # Take top 3 from each query
-                    }
-                    
-                    # Make API request
-                    response = requests.get(
-                        f"{self.base_url}/search/repositories",
-                        headers=self.headers,
-                        params=params,
-                        timeout=30
-                    )
-                    
-                    if response.status_code == 401:
-                        logger.warning("GitHub API authentication failed, using unauthenticated requests")
-                        # Remove auth header and retry
-                        headers_no_auth = {k: v for k, v in self.headers.items() if k != "Authorization"}
-                        response = requests.get(
-                            f"{self.base_url}/search/repositories",
-                            headers=headers_no_auth,
-                            params=params,
-                            timeout=30
-                        )
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        repositories = data.get("items", [])
-                        if repositories:
-                            all_repositories.extend(repositories)
-                            searched_queries.append(business_query)
-                    else:
-                        logger.warning(f"GitHub API error for query '{business_query}': {response.status_code}")
-                        
-                except Exception as e:
-                    logger.warning(f"Error searching for '{business_query}': {str(e)}")
-                    continue
-            
-            # Remove duplicates based on repository ID
             unique_repositories = []
             seen_ids = set()
-            for repo in all_repositories:
-                repo_id = repo.get("id")
-                if repo_id and repo_id not in seen_ids:
-                    unique_repositories.append(repo)
-                    seen_ids.add(repo_id)
-            
-            if not unique_repositories:
-                return f"No relevant business repositories found for query: '{query}'. Searched: {', '.join(business_queries)}"
+            searched_queries = []
             
-            # Create mock data structure for formatting
-            mock_data = {
-                "items": unique_repositories[:max_results],
-                "total_count": len(unique_repositories)
-            }
+            # The searches are independent I/O, so run them concurrently and stop as soon as
+            # enough unique repositories have come back
+            executor = ThreadPoolExecutor(max_workers=len(business_queries))
+            try:
+                futures = {executor.submit(self._search_one, q, language, sort, max_results): q for q in business_queries}
+                for future in as_completed(futures):
+                    self._collect_repositories(future.result(), futures[future], unique_repositories, seen_ids, searched_queries)
+                    if len(unique_repositories) >= max_results * OVERFETCH_FACTOR:
+                        break
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
             
-            return self._format_repository_results(mock_data, query, searched_queries)
+            return self._store_result(cache_key, unique_repositories,
+                                      self._build_results(query, max_results, business_queries, unique_repositories, searched_queries))
             
         except requests.exceptions.RequestException as e:
             logger.error(f"Request error during GitHub search: {str(e)}")
@@ -127,6 +127,207 @@ class GitHubTool:
             logger.error(f"Unexpected error during GitHub search: {str(e)}")
             return f"GitHub search failed with error: {str(e)}"
     
+    async def _arun(self, query: str, max_results: int = 3, language: str = "", sort: str = "stars",
+                    bypass_cache: bool = False) -> str:
+        """
+        Search for repositories on GitHub without blocking the event loop
+        
+        Args:
+            query: Search query for repositories
+            max_results: Maximum number of results to return
+            language: Programming language filter
+            sort: Sort criteria for results
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
+            
+        Returns:
+            Formatted repository information
+        """
+        cache_key = (query, max_results, language, sort)
+        cached = None if bypass_cache else self._cached_result(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            business_queries = self._business_queries(query)
+            
+            unique_repositories = []
+            seen_ids = set()
+            searched_queries = []
+            
+            async with self._client() as client:
+                tasks = [
+                    asyncio.ensure_future(self._asearch_one(client, business_query, language, sort, max_results))
+                    for business_query in business_queries
+                ]
+                try:
+                    # Collect in completion order and cancel the rest once enough unique repositories are in
+                    for next_done in asyncio.as_completed(tasks):
+                        business_query, repositories = await next_done
+                        self._collect_repositories(repositories, business_query, unique_repositories, seen_ids, searched_queries)
+                        if len(unique_repositories) >= max_results * OVERFETCH_FACTOR:
+                            break
+                finally:
+                    for task in tasks:
+                        task.cancel()
+            
+            return self._store_result(cache_key, unique_repositories,
+                                      self._build_results(query, max_results, business_queries, unique_repositories, searched_queries))
+            
+        except httpx.HTTPError as e:
+            logger.error(f"Request error during GitHub search: {str(e)}")
+            return f"GitHub search request failed: {str(e)}"
+        except Exception as e:
+            logger.error(f"Unexpected error during GitHub search: {str(e)}")
+            return f"GitHub search failed with error: {str(e)}"
+    
+    def _cached_result(self, cache_key: Tuple) -> Optional[str]:
+        """Return a cached formatted result, or None"""
+        with self._cache_lock:
+            return self._cache.get(cache_key)
+    
+    def _store_result(self, cache_key: Tuple, repositories: List[Dict[str, Any]], result: str) -> str:
+        """Cache a formatted result if the search found repositories (failures are retried next time)"""
+        if repositories:
+            with self._cache_lock:
+                self._cache[cache_key] = result
+        return result
+    
+    def _search_one(self, business_query: str, language: str, sort: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Search one business query, retrying without auth on 401; the repositories found, or None if the search failed"""
+        try:
+            params = self._search_params(business_query, language, sort, max_results)
+            
+            # Make API request
+            response = self.session.get(
+                f"{self.base_url}/search/repositories",
+                headers={**self.headers, **self._conditional_headers(params)},
+                params=params,
+                timeout=REQUEST_TIMEOUT
+            )
+            
+            if response.status_code == 401:
+                logger.warning("GitHub API authentication failed, using unauthenticated requests")
+                response = self.session.get(
+                    f"{self.base_url}/search/repositories",
+                    headers={**self._headers_without_auth(), **self._conditional_headers(params)},
+                    params=params,
+                    timeout=REQUEST_TIMEOUT
+                )
+            
+            return self._parse_response(response, business_query, params)
+        
+        except Exception as e:
+            logger.warning(f"Error searching for '{business_query}': {str(e)}")
+            return None
+    
+    async def _asearch_one(self, client: httpx.AsyncClient, business_query: str, language: str, sort: str,
+                           max_results: int) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+        """Search one business query without blocking, retrying without auth on 401; the repositories are None if the search failed"""
+        try:
+            params = self._search_params(business_query, language, sort, max_results)
+            
+            response = await client.get(
+                f"{self.base_url}/search/repositories",
+                headers={**self.headers, **self._conditional_headers(params)},
+                params=params,
+                timeout=REQUEST_TIMEOUT
+            )
+            
+            if response.status_code == 401:
+                logger.warning("GitHub API authentication failed, using unauthenticated requests")
+                response = await client.get(
+                    f"{self.base_url}/search/repositories",
+                    headers={**self._headers_without_auth(), **self._conditional_headers(params)},
+                    params=params,
+                    timeout=REQUEST_TIMEOUT
+                )
+            
+            return business_query, self._parse_response(response, business_query, params)
+        
+        except Exception as e:
+            logger.warning(f"Error searching for '{business_query}': {str(e)}")
+            return business_query, None
+    
+    def _client(self):
+        """Async context yielding the injected pooled client, or a one-off client for this call"""
+        if self.http_client is not None:
+            return contextlib.nullcontext(self.http_client)
+        return httpx.AsyncClient(timeout=30)
+    
+    def _business_queries(self, query: str) -> List[str]:
+        """Create business-relevant search queries, each OR-ing several business terms"""
+        return [f"{query} {business_filter}" for business_filter in BUSINESS_FILTERS]
+    
+    def _search_params(self, business_query: str, language: str, sort: str, max_results: int) -> Dict[str, Any]:
+        """Prepare repository search request parameters"""
+        search_query = business_query
+        if language:
+            search_query += f" language:{language}"
+        
+        return {
+            "q": search_query,
+            "sort": sort,
+            "order": "desc",
+            "per_page": min(max_results * 3, 100)  # Over-fetch for deduplication across queries
+        }
+    
+    def _headers_without_auth(self) -> Dict[str, str]:
+        """Request headers with the Authorization header removed"""
+        return {k: v for k, v in self.headers.items() if k != "Authorization"}
+    
+    def _conditional_headers(self, params: Dict[str, Any]) -> Dict[str, str]:
+        """If-None-Match header for a search request seen before (empty otherwise)"""
+        with self._cache_lock:
+            known = self._etags.get(tuple(params.items()))
+        return {"If-None-Match": known[0]} if known else {}
+    
+    def _parse_response(self, response, business_query: str, params: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """Repositories from a search response (reused from the last response on 304), or None on an API error"""
+        etag_key = tuple(params.items())
+        if response.status_code == 304:
+            with self._cache_lock:
+                known = self._etags.get(etag_key)
+            if known is not None:
+                return known[1]
+            logger.warning(f"GitHub API returned 304 for query '{business_query}' without a cached response")
+            return None
+        if response.status_code != 200:
+            logger.warning(f"GitHub API error for query '{business_query}': {response.status_code}")
+            return None
+        
+        data = orjson.loads(response.content)
+        # Keep only the fields the formatter uses; search items carry dozens more
+        repositories = [{key: repo[key] for key in REPOSITORY_FIELDS if key in repo} for repo in data.get("items", [])]
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._cache_lock:
+                self._etags[etag_key] = (etag, repositories)
+        return repositories
+    
+    def _collect_repositories(self, repositories: Optional[List[Dict[str, Any]]], business_query: str,
+                              unique_repositories: List[Dict[str, Any]], seen_ids: set, searched_queries: List[str]) -> None:
+        """Add new repositories (deduplicated by ID) from one search (None if it failed) to the running results"""
+        if repositories:
+            for repo in repositories:
+                repo_id = repo.get("id")
+                if repo_id and repo_id not in seen_ids:
+                    unique_repositories.append(repo)
+                    seen_ids.add(repo_id)
+            searched_queries.append(business_query)
+    
+    def _build_results(self, query: str, max_results: int, business_queries: List[str], unique_repositories: List[Dict[str, Any]], searched_queries: List[str]) -> str:
+        """Format the top collected repositories"""
+        if not unique_repositories:
+            return f"No relevant business repositories found for query: '{query}'. Searched: {', '.join(business_queries)}"
+        
+        # Create mock data structure for formatting
+        mock_data = {
+            "items": unique_repositories[:max_results],
+            "total_count": len(unique_repositories)
+        }
+        
+        return self._format_repository_results(mock_data, query, searched_queries)
+    
     def _format_repository_results(self, data: Dict[str, Any], query: str, searched_queries: List[str] = None) -> str:
         """Format GitHub repository results"""
         try:
@@ -157,29 +358,26 @@ class GitHubTool:
                 updated_at = repo.get("updated_at", "Unknown")
                 topics = repo.get("topics", [])
                 
-                # Format date
-                if updated_at != "Unknown":
-                    from datetime import datetime
-                    try:
-                        date_obj = datetime.fromisoformat(updated_at.replace('Z', '+00:00'))
-                        updated_at = date_obj.strftime("%Y-%m-%d")
-                    except:
-                        pass
-                
-                results.append(f"{i}. 🔧 {name}")
-                results.append(f"   👤 Owner: {full_name.split('/')[0] if '/' in full_name else 'Unknown'}")
-                results.append(f"   📝 Description: {description}")
-                results.append(f"   ⭐ Stars: {stars}")
-                results.append(f"   🍴 Forks: {forks}")
-                results.append(f"   💻 Language: {language}")
-                results.append(f"   📅 Updated: {updated_at}")
+                # GitHub timestamps are ISO 8601 UTC ("2024-01-31T12:00:00Z"); keep the date part
+                if updated_at:
+                    updated_at = updated_at[:10]
                 
-                if topics:
-                    results.append(f"   🏷️  Topics: {', '.join(topics[:5])}")
+                owner = full_name.split('/')[0] if '/' in full_name else 'Unknown'
+                topics_line = f"   🏷️  Topics: {', '.join(topics[:5])}\n" if topics else ""
                 
-                results.append(f"   🔗 Repository: {html_url}")
-                results.append(f"   📥 Clone: {clone_url}")
-                results.append("")
+                # One block per repository, ending in a blank separator line
+                results.append(
+                    f"{i}. 🔧 {name}\n"
+                    f"   👤 Owner: {owner}\n"
+                    f"   📝 Description: {description}\n"
+                    f"   ⭐ Stars: {stars}\n"
+                    f"   🍴 Forks: {forks}\n"
+                    f"   💻 Language: {language}\n"
+                    f"   📅 Updated: {updated_at}\n"
+                    f"{topics_line}"
+                    f"   🔗 Repository: {html_url}\n"
+                    f"   📥 Clone: {clone_url}\n"
+                )
             
             return "\n".join(results)
             
@@ -1,28 +1,53 @@
 """
 Kaggle Dataset Search Tool for finding relevant datasets
 """
-import requests
-from typing import List, Dict, Any, Optional
+import base64
+import contextlib
+import threading
+import httpx
+from cachetools import LRUCache, TTLCache
+from typing import List, Dict, Any, Optional, Tuple
 from config.settings import settings
+from utils.http import get_session
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Datasets change slowly, so search results are reused for an hour
+CACHE_TTL = 3600
+
 class KaggleTool:
     """Tool for searching Kaggle datasets"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.username = settings.KAGGLE_USERNAME
         self.api_key = settings.KAGGLE_KEY
         self.base_url = "https://www.kaggle.com/api/v1"
+        self.http_client = http_client
+        
+        # Headers are built once: the credentials do not change while the process runs
+        self.headers = {'Content-Type': 'application/json'}
+        if self.username and self.api_key:
+            credentials = base64.b64encode(f"{self.username}:{self.api_key}".encode()).decode()
+            self.headers['Authorization'] = f'Basic {credentials}'
+        
+        # The synchronous path uses the process-wide pooled session, with headers per request
+        self.session = get_session()
+        
+        # Formatted results per normalized query; a failed search falls back to the last good
+        # result for it, however old. The lock covers tool calls from worker threads and the event loop
+        self._cache = TTLCache(maxsize=512, ttl=CACHE_TTL)
+        self._last_good = LRUCache(maxsize=512)
+        self._cache_lock = threading.Lock()
     
-    def _run(self, query: str, max_results: int = 5) -> str:
+    def _run(self, query: str, max_results: int = 5, bypass_cache: bool = False) -> str:
         """
         Search for datasets on Kaggle
         
         Args:
             query: Search query for datasets
             max_results: Maximum number of results to return
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
             
         Returns:
             Formatted dataset information
@@ -31,65 +56,130 @@ class KaggleTool:
             if not self.api_key or not self.username:
                 return "Kaggle API credentials not configured. Please set KAGGLE_USERNAME and KAGGLE_KEY in environment variables."
             
-            headers = {
-                'Authorization': f'Basic {self._get_auth_token()}',
-                'Content-Type': 'application/json'
-            }
+            cache_key = self._cache_key(query, max_results)
+            cached = None if bypass_cache else self._cached_result(cache_key)
+            if cached is not None:
+                return cached
             
             # Search datasets
-            search_url = f"{self.base_url}/datasets/list"
-            params = {
-                'search': query,
-                'pageSize': max_results,
-                'sortBy': 'relevance'
-            }
+            response = self.session.get(
+                f"{self.base_url}/datasets/list",
+                headers=self.headers,
+                params=self._search_params(query, max_results),
+                timeout=30
+            )
+            return self._handle_response(response, query, cache_key)
+                
+        except Exception as e:
+            logger.error(f"Kaggle search error: {str(e)}")
+            return self._fallback_result(self._cache_key(query, max_results), f"Kaggle search failed: {str(e)}")
+    
+    async def _arun(self, query: str, max_results: int = 5, bypass_cache: bool = False) -> str:
+        """
+        Search for datasets on Kaggle without blocking the event loop
+        
+        Args:
+            query: Search query for datasets
+            max_results: Maximum number of results to return
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
             
-            response = requests.get(search_url, headers=headers, params=params, timeout=30)
+        Returns:
+            Formatted dataset information
+        """
+        try:
+            if not self.api_key or not self.username:
+                return "Kaggle API credentials not configured. Please set KAGGLE_USERNAME and KAGGLE_KEY in environment variables."
+            
+            cache_key = self._cache_key(query, max_results)
+            cached = None if bypass_cache else self._cached_result(cache_key)
+            if cached is not None:
+                return cached
             
-            if response.status_code == 200:
-                data = response.json()
-                return self._format_dataset_results(data, query)
-            else:
-                logger.error(f"Kaggle API error: {response.status_code} - {response.text}")
-                return f"Kaggle search failed with status {response.status_code}"
+            async with self._client() as client:
+                response = await client.get(
+                    f"{self.base_url}/datasets/list",
+                    headers=self.headers,
+                    params=self._search_params(query, max_results)
+                )
+            return self._handle_response(response, query, cache_key)
                 
         except Exception as e:
             logger.error(f"Kaggle search error: {str(e)}")
-            return f"Kaggle search failed: {str(e)}"
+            return self._fallback_result(self._cache_key(query, max_results), f"Kaggle search failed: {str(e)}")
+    
+    def _client(self):
+        """Async context yielding the injected pooled client, or a one-off client for this call"""
+        if self.http_client is not None:
+            return contextlib.nullcontext(self.http_client)
+        return httpx.AsyncClient(timeout=30)
     
-    def _get_auth_token(self) -> str:
-        """Get base64 encoded auth token for Kaggle API"""
-        import base64
-        credentials = f"{self.username}:{self.api_key}"
-        return base64.b64encode(credentials.encode()).decode()
+    def _search_params(self, query: str, max_results: int) -> Dict[str, Any]:
+        """Build dataset search parameters"""
+        return {
+            'search': query,
+            'pageSize': max_results,
+            'sortBy': 'relevance'
+        }
+    
+    def _cache_key(self, query: str, max_results: int) -> Tuple:
+        """Cache key for a search; queries differing only in case or surrounding spaces share an entry"""
+        return (query.strip().casefold(), max_results)
+    
+    def _cached_result(self, cache_key: Tuple) -> Optional[str]:
+        """Return a cached formatted result, or None"""
+        with self._cache_lock:
+            return self._cache.get(cache_key)
+    
+    def _store_result(self, cache_key: Tuple, result: str) -> str:
+        """Cache a formatted result, also keeping it as the fallback if a later search fails"""
+        with self._cache_lock:
+            self._cache[cache_key] = result
+            self._last_good[cache_key] = result
+        return result
+    
+    def _fallback_result(self, cache_key: Tuple, error: str) -> str:
+        """The last good result for a failed search, even if expired, or else the error message"""
+        with self._cache_lock:
+            stale = self._last_good.get(cache_key)
+        if stale is not None:
+            logger.warning("%s; serving the last cached result", error)
+            return stale
+        return error
+    
+    def _handle_response(self, response, query: str, cache_key: Tuple) -> str:
+        """Turn a Kaggle API response into formatted (and cached) results, or the fallback on an error"""
+        if response.status_code == 200:
+            data = response.json()
+            return self._store_result(cache_key, self._format_dataset_results(data, query))
+        else:
+            logger.error(f"Kaggle API error: {response.status_code} - {response.text}")
+            return self._fallback_result(cache_key, f"Kaggle search failed with status {response.status_code}")
     
     def _format_dataset_results(self, data: List[Dict[str, Any]], query: str) -> str:
         """Format Kaggle dataset results"""
         try:
-            results = []
-            results.append(f"=== KAGGLE DATASETS FOR: '{query}' ===\n")
-            
             if not data:
                 return f"No datasets found for query: '{query}'"
             
-            results.append(f"📊 Found {len(data)} datasets:\n")
+            results = [
+                f"=== KAGGLE DATASETS FOR: '{query}' ===\n",
+                f"📊 Found {len(data)} datasets:\n"
+            ]
             
             for i, dataset in enumerate(data, 1):
-                title = dataset.get('title', 'No title')
                 owner = dataset.get('owner', 'Unknown')
-                url = f"https://www.kaggle.com/datasets/{owner}/{dataset.get('name', '')}"
-                size = dataset.get('size', 'Unknown size')
-                downloads = dataset.get('downloadCount', 0)
                 tags = dataset.get('tags', [])
+                tags_line = f"   🏷️ Tags: {', '.join(tags[:5])}\n" if tags else ""
                 
-                results.append(f"{i}. **{title}**")
-                results.append(f"   👤 Owner: {owner}")
-                results.append(f"   📊 Size: {size}")
-                results.append(f"   ⬇️ Downloads: {downloads:,}")
-                if tags:
-                    results.append(f"   🏷️ Tags: {', '.join(tags[:5])}")
-                results.append(f"   🔗 URL: {url}")
-                results.append("")
+                # One block per dataset, ending in a blank separator line
+                results.append(
+                    f"{i}. **{dataset.get('title', 'No title')}**\n"
+                    f"   👤 Owner: {owner}\n"
+                    f"   📊 Size: {dataset.get('size', 'Unknown size')}\n"
+                    f"   ⬇️ Downloads: {dataset.get('downloadCount', 0):,}\n"
+                    f"{tags_line}"
+                    f"   🔗 URL: https://www.kaggle.com/datasets/{owner}/{dataset.get('name', '')}\n"
+                )
             
             return "\n".join(results)
             
@@ -1,26 +1,50 @@
 """
 Web Search Tool using Serper API for comprehensive market research
 """
-import requests
-from typing import Dict, Any, Optional
+import contextlib
+import re
+import threading
+import httpx
+from cachetools import LRUCache, TTLCache
+from typing import Dict, Any, Optional, Tuple
 from config.settings import settings
+from utils.http import get_session
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Web results go stale quickly, so they are only reused for five minutes
+CACHE_TTL = 300
+
+# Filler words ignored when matching queries against the cache, so rephrasings such as
+# "AI trends in retail" and "retail AI trends" share an entry
+QUERY_STOPWORDS = frozenset({"a", "an", "and", "the", "of", "in", "on", "for", "to", "with", "by", "about"})
+QUERY_TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['.\-][^\W_]+)*")
+
 class WebSearchTool:
     """Tool for performing web searches using Serper API"""
     
-    def __init__(self):
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
         self.api_key = settings.SERPER_API_KEY
         self.base_url = "https://google.serper.dev/search"
+        self.http_client = http_client
+        
+        # The synchronous path uses the process-wide pooled session, with headers per request
+        self.session = get_session()
+        
+        # Raw Serper payloads per normalized query; a failed search falls back to the last good
+        # result for it, however old. The lock covers tool calls from worker threads and the event loop
+        self._cache = TTLCache(maxsize=512, ttl=CACHE_TTL)
+        self._last_good = LRUCache(maxsize=512)
+        self._cache_lock = threading.Lock()
     
-    def _run(self, query: str) -> str:
+    def _run(self, query: str, bypass_cache: bool = False) -> str:
         """
         Perform web search using Serper API
         
         Args:
             query: Search query string
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
             
         Returns:
             Formatted search results
@@ -29,50 +53,127 @@ class WebSearchTool:
             if not self.api_key:
                 return "Serper API key not configured. Please set SERPER_API_KEY in environment variables."
             
-            headers = {
-                'X-API-KEY': self.api_key,
-                'Content-Type': 'application/json'
-            }
+            cache_key = self._cache_key(query)
+            cached = None if bypass_cache else self._cached_result(cache_key)
+            if cached is not None:
+                return self._format_results(cached, query)
             
-            payload = {
-                'q': query,
-                'num': 10
-            }
+            response = self.session.post(self.base_url, headers=self._headers(), json=self._payload(query), timeout=30)
+            return self._handle_response(response, query, cache_key)
+                
+        except Exception as e:
+            logger.error(f"Web search error: {str(e)}")
+            return self._fallback_result(self._cache_key(query), query, f"Search failed: {str(e)}")
+    
+    async def _arun(self, query: str, bypass_cache: bool = False) -> str:
+        """
+        Perform web search using Serper API without blocking the event loop
+        
+        Args:
+            query: Search query string
+            bypass_cache: Skip cached results and search again (the fresh result is still cached)
             
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=30)
+        Returns:
+            Formatted search results
+        """
+        try:
+            if not self.api_key:
+                return "Serper API key not configured. Please set SERPER_API_KEY in environment variables."
             
-            if response.status_code == 200:
-                data = response.json()
-                return self._format_results(data, query)
-            else:
-                logger.error(f"Serper API error: {response.status_code} - {response.text}")
-                return f"Search failed with status {response.status_code}"
+            cache_key = self._cache_key(query)
+            cached = None if bypass_cache else self._cached_result(cache_key)
+            if cached is not None:
+                return self._format_results(cached, query)
+            
+            async with self._client() as client:
+                response = await client.post(self.base_url, headers=self._headers(), json=self._payload(query))
+            return self._handle_response(response, query, cache_key)
                 
         except Exception as e:
             logger.error(f"Web search error: {str(e)}")
-            return f"Search failed: {str(e)}"
+            return self._fallback_result(self._cache_key(query), query, f"Search failed: {str(e)}")
+    
+    def _client(self):
+        """Async context yielding the injected pooled client, or a one-off client for this call"""
+        if self.http_client is not None:
+            return contextlib.nullcontext(self.http_client)
+        return httpx.AsyncClient(timeout=30)
+    
+    def _headers(self) -> Dict[str, str]:
+        """Build request headers for the Serper API"""
+        return {
+            'X-API-KEY': self.api_key,
+            'Content-Type': 'application/json'
+        }
+    
+    def _payload(self, query: str) -> Dict[str, Any]:
+        """Build request payload for the Serper API"""
+        return {
+            'q': query,
+            'num': 10
+        }
+    
+    def _cache_key(self, query: str) -> Tuple:
+        """Cache key for a search: its distinct words, ignoring order, case, punctuation and filler words"""
+        normalized = query.strip().casefold()
+        # Quoted phrases and search operators depend on exact wording, so those keep the full query
+        if '"' in normalized or ":" in normalized:
+            return (normalized,)
+        return tuple(sorted(set(QUERY_TOKEN_PATTERN.findall(normalized)) - QUERY_STOPWORDS)) or (normalized,)
+    
+    def _cached_result(self, cache_key: Tuple) -> Optional[Dict[str, Any]]:
+        """Return a cached Serper payload, or None"""
+        with self._cache_lock:
+            return self._cache.get(cache_key)
+    
+    def _store_result(self, cache_key: Tuple, data: Dict[str, Any]) -> None:
+        """Cache a raw Serper payload, also keeping it as the fallback if a later search fails
+        
+        The payload rather than its formatted text is cached, since the text names the query and a
+        reworded query sharing the key must be reported under its own wording
+        """
+        with self._cache_lock:
+            self._cache[cache_key] = data
+            self._last_good[cache_key] = data
+    
+    def _fallback_result(self, cache_key: Tuple, query: str, error: str) -> str:
+        """The last good result for a failed search, even if expired, or else the error message"""
+        with self._cache_lock:
+            stale = self._last_good.get(cache_key)
+        if stale is not None:
+            logger.warning("%s; serving the last cached result", error)
+            return self._format_results(stale, query)
+        return error
+    
+    def _handle_response(self, response, query: str, cache_key: Tuple) -> str:
+        """Turn a Serper API response into formatted (and cached) results, or the fallback on an error"""
+        if response.status_code == 200:
+            data = response.json()
+            self._store_result(cache_key, data)
+            return self._format_results(data, query)
+        else:
+            logger.error(f"Serper API error: {response.status_code} - {response.text}")
+            return self._fallback_result(cache_key, query, f"Search failed with status {response.status_code}")
     
     def _format_results(self, data: Dict[str, Any], query: str) -> str:
         """Format search results for display"""
         try:
-            results = []
-            results.append(f"=== WEB SEARCH RESULTS FOR: '{query}' ===\n")
-            
             organic_results = data.get('organic', [])
             if not organic_results:
                 return f"No results found for query: '{query}'"
             
-            results.append(f"📊 Found {len(organic_results)} results:\n")
+            results = [
+                f"=== WEB SEARCH RESULTS FOR: '{query}' ===\n",
+                f"📊 Found {len(organic_results)} results:\n"
+            ]
             
+            # One block per result, ending in a blank separator line
             for i, result in enumerate(organic_results[:10], 1):
-                title = result.get('title', 'No title')
-                link = result.get('link', '')
-                snippet = result.get('snippet', 'No description')
-                
-                results.append(f"{i}. **{title}**")
-                results.append(f"   🔗 {link}")
-                results.append(f"   📝 {snippet}")
-                results.append("")
+                results.append(
+                    f"{i}. **{result.get('title', 'No title')}**\n"
+                    f"   🔗 {result.get('link', '')}\n"
+                    f"   📝 {result.get('snippet', 'No description')}\n"
+                )
             
             return "\n".join(results)
             
@@ -1,26 +1,79 @@
 """
 Comprehensive Error Handling and Validation Utilities
 """
+import asyncio
 import logging
+import random
+import re
+import time
 import traceback
 from typing import Dict, Any, Optional, Callable
 from functools import wraps
+from cachetools.func import ttl_cache
 import requests
 from datetime import datetime
-import json
+import orjson
 
 logger = logging.getLogger(__name__)
 
+# Characters rejected by the input validators, as single character classes
+COMPANY_INVALID_CHARS = re.compile(r"""[<>"'&;()|`$]""")
+FILE_PATH_INVALID_CHARS = re.compile(r"""[<>"'&;|`$\\]""")
+
+# Industries accepted by validate_industry_input, in display order, with a set for lookups
+VALID_INDUSTRIES = (
+    "Manufacturing", "Automotive", "Finance", "Retail", "Healthcare",
+    "Technology", "Energy", "Agriculture", "Transportation", "Education",
+    "Real Estate", "Entertainment", "Telecommunications", "Aerospace",
+    "Pharmaceuticals", "Food & Beverage", "Construction", "Other"
+)
+VALID_INDUSTRY_SET = frozenset(VALID_INDUSTRIES)
+
+# Markup and URL schemes stripped from output, matched in one pass regardless of case
+OUTPUT_UNSAFE_PATTERN = re.compile("|".join(map(re.escape, [
+    '<script', '</script>',
+    'javascript:',
+    'data:text/html',
+    'vbscript:',
+    'onload=',
+    'onerror='
+])), re.IGNORECASE)
+
+# Markdown shown in place of a proposal when the system fails
+FALLBACK_RESPONSE_TEMPLATE = """
+    # System Error - Fallback Response
+    
+    We apologize, but the system encountered an error while processing your request.
+    
+    **Error Details:**
+    - Error Type: {error_type}
+    - Error Message: {error_message}
+    - Context: {context}
+    - Timestamp: {timestamp}
+    
+    **Recommended Actions:**
+    1. Please try again in a few minutes
+    2. Check your internet connection
+    3. Verify that all API keys are properly configured
+    4. Contact support if the issue persists
+    
+    **System Status:**
+    The Multi-Agent AI system is temporarily unavailable. Please try again later.
+    """
+
 class SystemError(Exception):
     """Base exception for system errors"""
     pass
 
 class APIError(SystemError):
     """Exception for API-related errors"""
-    def __init__(self, message: str, status_code: Optional[int] = None, response: Optional[str] = None):
+    def __init__(self, message: str, status_code: Optional[int] = None, response: Optional[str] = None,
+                 retry_after: Optional[float] = None):
         super().__init__(message)
         self.status_code = status_code
         self.response = response
+        # Seconds the server asked clients to wait (Retry-After), if it said
+        self.retry_after = retry_after
 
 class ValidationError(SystemError):
     """Exception for validation errors"""
@@ -64,8 +117,7 @@ def validate_company_input(company: str) -> bool:
         raise ValidationError("Company name must be less than 100 characters")
     
     # Check for potentially harmful characters
-    dangerous_chars = ['<', '>', '"', "'", '&', ';', '(', ')', '|', '`', '$']
-    if any(char in company for char in dangerous_chars):
+    if COMPANY_INVALID_CHARS.search(company):
         raise ValidationError("Company name contains invalid characters")
     
     return True
@@ -75,15 +127,8 @@ def validate_industry_input(industry: str) -> bool:
     if not industry or not isinstance(industry, str):
         raise ValidationError("Industry must be a non-empty string")
     
-    valid_industries = [
-        "Manufacturing", "Automotive", "Finance", "Retail", "Healthcare",
-        "Technology", "Energy", "Agriculture", "Transportation", "Education",
-        "Real Estate", "Entertainment", "Telecommunications", "Aerospace",
-        "Pharmaceuticals", "Food & Beverage", "Construction", "Other"
-    ]
-    
-    if industry not in valid_industries:
-        raise ValidationError(f"Industry must be one of: {', '.join(valid_industries)}")
+    if industry not in VALID_INDUSTRY_SET:
+        raise ValidationError(f"Industry must be one of: {', '.join(VALID_INDUSTRIES)}")
     
     return True
 
@@ -93,20 +138,26 @@ def validate_api_response(response: requests.Response, expected_status: int = 20
         error_msg = f"API returned status {response.status_code}"
         if response.text:
             error_msg += f": {response.text[:500]}"
-        raise APIError(error_msg, response.status_code, response.text)
+        retry_after = response.headers.get("Retry-After", "")
+        raise APIError(error_msg, response.status_code, response.text,
+                       retry_after=float(retry_after) if retry_after.isdigit() else None)
     
     return True
 
 def safe_json_parse(data: str, default: Any = None) -> Any:
     """Safely parse JSON data with fallback"""
     try:
-        return json.loads(data)
-    except json.JSONDecodeError as e:
+        return orjson.loads(data)
+    except orjson.JSONDecodeError as e:
         logger.warning(f"Failed to parse JSON: {str(e)}")
         return default
 
 def log_system_event(event_type: str, message: str, details: Optional[Dict[str, Any]] = None):
     """Log system events with structured format"""
+    # Skip building and serializing the event when INFO is disabled
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     event_data = {
         "timestamp": datetime.now().isoformat(),
         "event_type": event_type,
@@ -114,7 +165,7 @@ def log_system_event(event_type: str, message: str, details: Optional[Dict[str,
         "details": details or {}
     }
     
-    logger.info(f"SYSTEM_EVENT: {json.dumps(event_data)}")
+    logger.info("SYSTEM_EVENT: %s", orjson.dumps(event_data, option=orjson.OPT_NON_STR_KEYS).decode())
 
 def create_error_report(error: Exception, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """Create a structured error report"""
@@ -127,46 +178,68 @@ def create_error_report(error: Exception, context: Optional[Dict[str, Any]] = No
     }
 
 def retry_on_failure(max_retries: int = 3, delay: float = 1.0, backoff: float = 2.0):
-    """Decorator to retry function on failure"""
+    """Decorator to retry a function (sync or async) on API failures, with jittered exponential backoff"""
+    retryable = (APIError, requests.exceptions.RequestException)
+    
+    def wait_time(error: Exception, current_delay: float) -> float:
+        # +/-50% jitter keeps concurrent callers from retrying in lockstep; a server's
+        # Retry-After is treated as the minimum
+        wait = current_delay * (0.5 + random.random())
+        return max(wait, getattr(error, "retry_after", None) or 0)
+    
     def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                current_delay = delay
+                for attempt in range(max_retries + 1):
+                    try:
+                        return await func(*args, **kwargs)
+                    except retryable as e:
+                        if attempt == max_retries:
+                            logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
+                            raise
+                        wait = wait_time(e, current_delay)
+                        logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}. Retrying in {wait:.1f}s...")
+                        await asyncio.sleep(wait)
+                        current_delay *= backoff
+                    except Exception as e:
+                        # Don't retry on non-API errors
+                        logger.error(f"Non-retryable error in {func.__name__}: {str(e)}")
+                        raise
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            last_exception = None
             current_delay = delay
-            
             for attempt in range(max_retries + 1):
                 try:
                     return func(*args, **kwargs)
-                except (APIError, requests.exceptions.RequestException) as e:
-                    last_exception = e
-                    if attempt < max_retries:
-                        logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}. Retrying in {current_delay}s...")
-                        time.sleep(current_delay)
-                        current_delay *= backoff
-                    else:
+                except retryable as e:
+                    if attempt == max_retries:
                         logger.error(f"All {max_retries + 1} attempts failed for {func.__name__}")
+                        raise
+                    wait = wait_time(e, current_delay)
+                    logger.warning(f"Attempt {attempt + 1} failed for {func.__name__}: {str(e)}. Retrying in {wait:.1f}s...")
+                    time.sleep(wait)
+                    current_delay *= backoff
                 except Exception as e:
                     # Don't retry on non-API errors
                     logger.error(f"Non-retryable error in {func.__name__}: {str(e)}")
-                    raise e
-            
-            # If we get here, all retries failed
-            raise last_exception
+                    raise
         
         return wrapper
     return decorator
 
 def validate_file_path(file_path: str) -> bool:
     """Validate file path for security"""
-    import os
-    
     # Check for path traversal attempts
     if '..' in file_path or file_path.startswith('/'):
         raise ValidationError("Invalid file path: path traversal not allowed")
     
     # Check for dangerous characters
-    dangerous_chars = ['<', '>', '"', "'", '&', ';', '|', '`', '$', '\\']
-    if any(char in file_path for char in dangerous_chars):
+    if FILE_PATH_INVALID_CHARS.search(file_path):
         raise ValidationError("Invalid file path: contains dangerous characters")
     
     return True
@@ -181,20 +254,11 @@ def sanitize_output(output: str, max_length: int = 10000) -> str:
         output = output[:max_length] + "... [truncated]"
     
     # Remove potentially harmful content
-    dangerous_patterns = [
-        '<script', '</script>',
-        'javascript:',
-        'data:text/html',
-        'vbscript:',
-        'onload=',
-        'onerror='
-    ]
-    
-    for pattern in dangerous_patterns:
-        output = output.replace(pattern, '[removed]')
-    
-    return output
+    return OUTPUT_UNSAFE_PATTERN.sub('[removed]', output)
 
+# Frequent callers (e.g. a readiness probe) reuse the last snapshot for 10 seconds instead of
+# repeating the filesystem checks; the API key status is already computed once per process
+@ttl_cache(maxsize=1, ttl=10)
 def check_system_health() -> Dict[str, Any]:
     """Check system health and return status"""
     health_status = {
@@ -205,18 +269,17 @@ def check_system_health() -> Dict[str, Any]:
     
     try:
         # Check if output directories exist
-        import os
         from config.settings import settings
         
         output_dir = settings.REPORTS_DIR
-        if not os.path.exists(output_dir):
-            os.makedirs(output_dir, exist_ok=True)
+        if not output_dir.exists():
+            output_dir.mkdir(parents=True, exist_ok=True)
             health_status["checks"]["output_directory"] = "created"
         else:
             health_status["checks"]["output_directory"] = "exists"
         
         # Check API key configuration
-        api_validation = settings.validate_api_keys()
+        api_validation = settings.api_key_status
         health_status["checks"]["api_keys"] = "valid" if api_validation["valid"] else "invalid"
         
         if not api_validation["valid"]:
@@ -242,26 +305,9 @@ def check_system_health() -> Dict[str, Any]:
 
 def create_fallback_response(error: Exception, context: str) -> str:
     """Create a fallback response when the system fails"""
-    return f"""
-    # System Error - Fallback Response
-    
-    We apologize, but the system encountered an error while processing your request.
-    
-    **Error Details:**
-    - Error Type: {type(error).__name__}
-    - Error Message: {str(error)}
-    - Context: {context}
-    - Timestamp: {datetime.now().isoformat()}
-    
-    **Recommended Actions:**
-    1. Please try again in a few minutes
-    2. Check your internet connection
-    3. Verify that all API keys are properly configured
-    4. Contact support if the issue persists
-    
-    **System Status:**
-    The Multi-Agent AI system is temporarily unavailable. Please try again later.
-    """
-
-# Import time for retry decorator
-import time
+    return FALLBACK_RESPONSE_TEMPLATE.format(
+        error_type=type(error).__name__,
+        error_message=str(error),
+        context=context,
+        timestamp=datetime.now().isoformat()
+    )
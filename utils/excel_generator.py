@@ -5,6 +5,7 @@ Generates Excel files matching the company's expected format
 import os
 import pandas as pd
 import openpyxl
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils.dataframe import dataframe_to_rows
 from typing import Dict, Any, List
@@ -15,6 +16,34 @@ from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
+# Extraction patterns, compiled once. Use case headings are tried in order and the first
+# style that matches wins; each is paired with a literal (lowercase) it cannot match without,
+# so a style absent from the text is ruled out by a substring check instead of a regex scan
+USE_CASE_PATTERNS = tuple((literal, re.compile(pattern, re.IGNORECASE)) for literal, pattern in (
+    ("use case ", r'Use Case (\d+):\s*([^\n]+)'),
+    ("**", r'(\d+)\.\s*\*\*([^*]+)\*\*'),
+    (".", r'(\d+)\.\s*([^\n]+)')
+))
+OBJECTIVE_PATTERNS = tuple(re.compile(rf'{label}[:\s]*([^\.]+)', re.IGNORECASE) for label in ("Objective", "Purpose", "Goal"))
+APPLICATION_PATTERNS = tuple(re.compile(rf'{label}[:\s]*([^\.]+)', re.IGNORECASE) for label in ("AI Application", "Implementation", "Solution"))
+# Benefit areas, in the order they are listed, matched by one alternation in a single scan
+BENEFIT_LABELS = ("Operations", "Finance", "Customer", "Marketing", "Sales")
+BENEFIT_PATTERN = re.compile(rf'({"|".join(BENEFIT_LABELS)})[:\s]*([^\.]+)', re.IGNORECASE)
+
+# Cell styles, built once and shared by every cell that uses them. Every written cell gets
+# the border and top-aligned wrapping; fonts and the fill are per row kind
+THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+WRAP_ALIGNMENT = Alignment(wrap_text=True, vertical='top')
+TITLE_FONT = Font(size=16, bold=True, color="FFFFFF")
+TITLE_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+USE_CASE_FONT = Font(size=12, bold=True)
+SECTION_FONT = Font(size=14, bold=True)
+
 class ExcelReportGenerator:
     """Generates Excel reports matching company sample format"""
     
@@ -33,12 +62,14 @@ class ExcelReportGenerator:
             Excel file content as bytes
         """
         try:
-            # Create workbook
-            self.workbook = openpyxl.Workbook()
+            # Write-only workbook: rows are streamed out as they are appended, each cell
+            # styled as it is written, rather than kept in memory and formatted afterwards
+            self.workbook = openpyxl.Workbook(write_only=True)
             
-            # Create main worksheet
-            self.worksheet = self.workbook.active
-            self.worksheet.title = "AI Use Cases Proposal"
+            # Create main worksheet; dimensions must be set before any row is written
+            self.worksheet = self.workbook.create_sheet("AI Use Cases Proposal")
+            self.worksheet.column_dimensions['A'].width = 100
+            self.worksheet.row_dimensions[7].height = 60
             
             # Generate header
             self._generate_header(data)
@@ -49,9 +80,6 @@ class ExcelReportGenerator:
             # Generate summary section
             self._generate_summary_section(data)
             
-            # Apply formatting
-            self._apply_formatting()
-            
             # Save to BytesIO for in-memory download
             from io import BytesIO
             excel_buffer = BytesIO()
@@ -66,81 +94,84 @@ class ExcelReportGenerator:
             logger.error(f"Excel generation failed: {str(e)}")
             raise
     
+    def _write_row(self, value: Any = None, font: Font = None, fill: PatternFill = None):
+        """Append a row with one styled cell in column A, or an empty row if there is no value"""
+        if value is None:
+            self.worksheet.append([])
+            return
+        cell = WriteOnlyCell(self.worksheet, value=value)
+        cell.border = THIN_BORDER
+        cell.alignment = WRAP_ALIGNMENT
+        if font is not None:
+            cell.font = font
+        if fill is not None:
+            cell.fill = fill
+        self.worksheet.append([cell])
+    
     def _generate_header(self, data: Dict[str, Any]):
-        """Generate report header"""
+        """Generate report header (rows 1-8)"""
         # Title
-        self.worksheet['A1'] = f"GenAI & ML Use Cases for {data['company']}"
-        self.worksheet['A1'].font = Font(size=16, bold=True)
+        self._write_row(f"GenAI & ML Use Cases for {data['company']}", font=TITLE_FONT, fill=TITLE_FILL)
+        self._write_row()
         
         # Company info
-        self.worksheet['A3'] = f"Company: {data['company']}"
-        self.worksheet['A4'] = f"Industry: {data['industry']}"
-        self.worksheet['A5'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+        self._write_row(f"Company: {data['company']}")
+        self._write_row(f"Industry: {data['industry']}")
+        self._write_row(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        self._write_row()
         
-        # Description
+        # Description (row 7, given extra height up front)
         description = f"As one of the leading companies in the {data['industry']} sector, {data['company']} can leverage Generative AI, Large Language Models (LLMs) and Machine Learning to enhance operational efficiency, improve product quality, and expand service offerings. The following use cases can be realized:"
-        self.worksheet['A7'] = description
-        self.worksheet['A7'].alignment = Alignment(wrap_text=True)
-        
-        # Set row height for description
-        self.worksheet.row_dimensions[7].height = 60
+        self._write_row(description)
+        self._write_row()
     
     def _generate_use_cases_section(self, data: Dict[str, Any]):
-        """Generate use cases section"""
+        """Generate use cases section (from row 9)"""
         # Extract use cases from the data
         use_cases = self._extract_use_cases(data.get('use_cases', ''))
         
-        # Start from row 9
-        current_row = 9
-        
         for i, use_case in enumerate(use_cases, 1):
             # Use Case Title
-            self.worksheet[f'A{current_row}'] = f"Use Case {i}: {use_case['title']}"
-            self.worksheet[f'A{current_row}'].font = Font(size=12, bold=True)
-            current_row += 1
+            self._write_row(f"Use Case {i}: {use_case['title']}", font=USE_CASE_FONT)
             
             # Objective/Use Case
-            self.worksheet[f'A{current_row}'] = f"* Objective/Use Case: {use_case['objective']}"
-            current_row += 1
+            self._write_row(f"* Objective/Use Case: {use_case['objective']}")
             
             # AI Application
-            self.worksheet[f'A{current_row}'] = f"* AI Application: {use_case['application']}"
-            current_row += 1
+            self._write_row(f"* AI Application: {use_case['application']}")
             
             # Cross-Functional Benefit
-            self.worksheet[f'A{current_row}'] = "* Cross-Functional Benefit:"
-            current_row += 1
+            self._write_row("* Cross-Functional Benefit:")
             
             for benefit in use_case['benefits']:
-                self.worksheet[f'A{current_row}'] = f"   * {benefit}"
-                current_row += 1
+                self._write_row(f"   * {benefit}")
             
             # Separator line
-            self.worksheet[f'A{current_row}'] = "________________"
-            current_row += 2  # Extra space between use cases
+            self._write_row("________________")
+            self._write_row()  # Extra space between use cases
     
     def _extract_use_cases(self, use_cases_text: str) -> List[Dict[str, Any]]:
         """Extract structured use cases from text"""
         use_cases = []
         
-        # Split by use case patterns
-        patterns = [
-            r'Use Case (\d+):\s*([^\n]+)',
-            r'(\d+)\.\s*\*\*([^*]+)\*\*',
-            r'(\d+)\.\s*([^\n]+)'
-        ]
-        
         # Try to extract numbered use cases
-        for pattern in patterns:
-            matches = re.findall(pattern, use_cases_text, re.IGNORECASE)
+        lowered = use_cases_text.lower()
+        for literal, pattern in USE_CASE_PATTERNS:
+            if literal not in lowered:
+                continue
+            matches = list(pattern.finditer(use_cases_text))
             if matches:
-                for match in matches:
+                # Each use case's details are read from its own section only: the text between
+                # its heading and the next one
+                ends = [match.start() for match in matches[1:]] + [len(use_cases_text)]
+                for match, end in zip(matches[:20], ends):
+                    section = use_cases_text[match.end():end]
                     use_case = {
-                        'number': match[0],
-                        'title': match[1].strip(),
-                        'objective': self._extract_objective(use_cases_text, match[0]),
-                        'application': self._extract_application(use_cases_text, match[0]),
-                        'benefits': self._extract_benefits(use_cases_text, match[0])
+                        'number': match.group(1),
+                        'title': match.group(2).strip(),
+                        'objective': self._extract_objective(section),
+                        'application': self._extract_application(section),
+                        'benefits': self._extract_benefits(section)
                     }
                     use_cases.append(use_case)
                 break
@@ -151,39 +182,27 @@ class ExcelReportGenerator:
         
         return use_cases[:20]  # Limit to 20 use cases
     
-    def _extract_objective(self, text: str, use_case_num: str) -> str:
+    def _extract_objective(self, text: str) -> str:
         """Extract objective from use case text"""
         # Look for objective patterns
-        patterns = [
-            r'Objective[:\s]*([^\.]+)',
-            r'Purpose[:\s]*([^\.]+)',
-            r'Goal[:\s]*([^\.]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in OBJECTIVE_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
         return f"Enhance operational efficiency and business value through AI implementation"
     
-    def _extract_application(self, text: str, use_case_num: str) -> str:
+    def _extract_application(self, text: str) -> str:
         """Extract AI application description"""
         # Look for application patterns
-        patterns = [
-            r'AI Application[:\s]*([^\.]+)',
-            r'Implementation[:\s]*([^\.]+)',
-            r'Solution[:\s]*([^\.]+)'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in APPLICATION_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
         return f"Implement AI-powered solutions to optimize business processes and decision-making"
     
-    def _extract_benefits(self, text: str, use_case_num: str) -> List[str]:
+    def _extract_benefits(self, text: str) -> List[str]:
         """Extract cross-functional benefits"""
         benefits = [
             "Operations: Improves efficiency and reduces costs",
@@ -192,19 +211,9 @@ class ExcelReportGenerator:
         ]
         
         # Try to extract specific benefits from text
-        benefit_patterns = [
-            r'Operations[:\s]*([^\.]+)',
-            r'Finance[:\s]*([^\.]+)',
-            r'Customer[:\s]*([^\.]+)',
-            r'Marketing[:\s]*([^\.]+)',
-            r'Sales[:\s]*([^\.]+)'
-        ]
-        
-        extracted_benefits = []
-        for pattern in benefit_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                extracted_benefits.append(f"{pattern.split(':')[0]}: {match.strip()}")
+        found = [(match.group(1).title(), match.group(2).strip()) for match in BENEFIT_PATTERN.finditer(text)]
+        found.sort(key=lambda benefit: BENEFIT_LABELS.index(benefit[0]))
+        extracted_benefits = [f"{label}: {detail}" for label, detail in found]
         
         return extracted_benefits if extracted_benefits else benefits
     
@@ -235,47 +244,20 @@ class ExcelReportGenerator:
     
     def _generate_summary_section(self, data: Dict[str, Any]):
         """Generate summary section"""
-        # Find the last row with content
-        max_row = self.worksheet.max_row
-        summary_start = max_row + 3
+        # Two blank rows after the last use case
+        self._write_row()
         
         # Summary title
-        self.worksheet[f'A{summary_start}'] = "Implementation Summary"
-        self.worksheet[f'A{summary_start}'].font = Font(size=14, bold=True)
+        self._write_row("Implementation Summary", font=SECTION_FONT)
         
         # Summary content
         summary_content = [
-            f"Total Use Cases Identified: 15-20",
-            f"Implementation Timeline: 12-18 months",
-            f"Expected ROI: 300-500% over 3 years",
-            f"Key Benefits: Operational efficiency, cost reduction, revenue enhancement",
-            f"Technology Stack: AI/ML platforms, cloud infrastructure, data analytics"
+            "Total Use Cases Identified: 15-20",
+            "Implementation Timeline: 12-18 months",
+            "Expected ROI: 300-500% over 3 years",
+            "Key Benefits: Operational efficiency, cost reduction, revenue enhancement",
+            "Technology Stack: AI/ML platforms, cloud infrastructure, data analytics"
         ]
         
-        for i, content in enumerate(summary_content, 1):
-            self.worksheet[f'A{summary_start + i}'] = content
-    
-    def _apply_formatting(self):
-        """Apply formatting to the worksheet"""
-        # Set column widths
-        self.worksheet.column_dimensions['A'].width = 100
-        
-        # Apply borders and alignment
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        
-        # Apply formatting to all cells with content
-        for row in self.worksheet.iter_rows():
-            for cell in row:
-                if cell.value:
-                    cell.border = thin_border
-                    cell.alignment = Alignment(wrap_text=True, vertical='top')
-        
-        # Header formatting
-        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        self.worksheet['A1'].fill = header_fill
-        self.worksheet['A1'].font = Font(size=16, bold=True, color="FFFFFF")
+        for content in summary_content:
+            self._write_row(content)
@@ -0,0 +1,33 @@
+"""
+Process-wide HTTP session shared by the tools' synchronous request paths
+"""
+import atexit
+from functools import lru_cache
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+@lru_cache(maxsize=None)
+def get_session() -> requests.Session:
+    """
+    Return the shared pooled session, creating it on first use
+
+    The session carries no API headers, so callers pass their own per request. Retries back
+    off on rate limits and server errors.
+    """
+    session = requests.Session()
+    retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def _close_session() -> None:
+    """Release the shared session's connections, if it was ever created"""
+    if get_session.cache_info().currsize:
+        get_session().close()
+
+
+atexit.register(_close_session)
@@ -0,0 +1,54 @@
+"""
+LangChain extensions used by the proposal system. Kept out of ai_proposal_system
+so importing that module does not pull in LangChain until a system is created.
+"""
+import logging
+from typing import Any, Callable, Dict, List
+from langchain_core.callbacks import AsyncCallbackHandler
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class TokenStreamHandler(AsyncCallbackHandler):
+    """Forward streamed LLM tokens to a caller-supplied callback as they arrive"""
+    
+    def __init__(self, on_token: Callable[[str], None]):
+        self.on_token = on_token
+        # Stays False when the response came from the LLM cache, which emits no tokens
+        self.streamed = False
+    
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        if token:
+            self.streamed = True
+            self.on_token(token)
+
+
+class ToolTraceHandler(AsyncCallbackHandler):
+    """Log agent tool calls at DEBUG level (in place of verbose agent printing)"""
+    
+    async def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        logger.debug("Tool %s called with: %s", serialized.get("name"), input_str)
+    
+    async def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        logger.debug("Tool returned %d characters", len(str(output)))
+
+
+class ResearchSummary(BaseModel):
+    """Key points extracted from the research report for downstream prompts"""
+    
+    key_trends: List[str] = Field(description="Industry and AI adoption trends, with figures where given")
+    competitors: List[str] = Field(description="Named competitors and how they use AI")
+    opportunities: List[str] = Field(description="Market and AI opportunities for the company")
+    
+    def to_prompt(self) -> str:
+        """Render the summary as compact bullet lists"""
+        sections = (
+            ("Key trends", self.key_trends),
+            ("Competitors", self.competitors),
+            ("Opportunities", self.opportunities),
+        )
+        return "\n\n".join(
+            f"{title}:\n" + "\n".join(f"- {item}" for item in items)
+            for title, items in sections if items
+        )
@@ -2,14 +2,33 @@
 Use Case Validation and Output Generation Utilities
 Ensures exactly 15-20 use cases across 5 categories with proper validation
 """
+import copy
+import hashlib
 import re
 import json
 import logging
+import threading
+from collections import Counter
+from cachetools import LRUCache
 from typing import Dict, Any, List, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Numbered use case layouts, compiled once and tried in order; the first that matches wins.
+# Each is paired with a literal it cannot match without, so a layout absent from the text is
+# ruled out by a substring check instead of a full scan. Titles are matched possessively: giving
+# characters back could never let the closing "\n" or "**" match, and on malformed output
+# (many "N." on one long line) the backtracking made extraction quadratic. The patterns hold no
+# letters and no ".", so they need neither IGNORECASE nor DOTALL, which only slowed matching
+USE_CASE_PATTERNS = tuple((literal, re.compile(pattern)) for literal, pattern in (
+    ("**", r'(\d+)\.\s*\*\*([^*]++)\*\*\s*([^0-9]*?)(?=\d+\.\s*\*\*|\Z)'),
+    (".", r'(\d+)\.\s*([^\n]++)\n([^0-9]*?)(?=\d+\.|\Z)'),
+    ("##", r'##\s*(\d+)\.\s*([^\n]++)\n([^#]*?)(?=##|\Z)')
+))
+# Line-by-line fallback: a line starting with "N." opens a new use case
+NUMBERED_LINE_PATTERN = re.compile(r'^(\d+)\.\s*')
+
 class UseCaseValidator:
     """Validates that generated use cases meet exact requirements"""
     
@@ -21,6 +40,9 @@ class UseCaseValidator:
         "Automation & Optimization": {"min": 2, "max": 3}
     }
     
+    # Total counts outside this range are too far off for category feedback to be useful
+    PLAUSIBLE_COUNT = {"min": 10, "max": 30}
+    
     CATEGORY_KEYWORDS = {
         "Generative AI & LLMs": [
             "generative ai", "llm", "large language model", "gpt", "chatbot", 
@@ -48,9 +70,45 @@ class UseCaseValidator:
             "resource optimization", "supply chain optimization", "business process"
         ]
     }
+    
+    # All category keywords in one pattern, so a use case is scanned once rather than once per
+    # keyword. The lookahead lets matches overlap, so a keyword inside a longer one
+    # ("classification" in "text classification") is still found
+    KEYWORD_PATTERN = re.compile(
+        "(?=(" + "|".join(re.escape(keyword) for keywords in CATEGORY_KEYWORDS.values() for keyword in keywords) + "))"
+    )
+    KEYWORD_CATEGORIES = {keyword: category for category, keywords in CATEGORY_KEYWORDS.items() for keyword in keywords}
+    
+    # Categories for use cases matching no keyword, checked in order; anything else is automation
+    FALLBACK_PATTERNS = tuple((category, re.compile("|".join(terms))) for category, terms in (
+        ("Generative AI & LLMs", ("chatbot", "content", "generate", "language")),
+        ("Computer Vision", ("image", "visual", "vision", "detection")),
+        ("Predictive Analytics & ML", ("predict", "forecast", "analytics", "model")),
+        ("Natural Language Processing", ("text", "document", "sentiment"))
+    ))
+    
+    def __init__(self):
+        # Results per use case text, keyed by digest: regeneration cycles often revalidate
+        # identical output. Callers get copies, so the cached results stay untouched
+        self._results = LRUCache(maxsize=64)
+        self._results_lock = threading.Lock()
 
     def validate_use_cases(self, use_cases_text: str) -> Dict[str, Any]:
         """Validate use cases meet exact requirements"""
+        if not isinstance(use_cases_text, str):
+            return self._validate(use_cases_text)
+        
+        key = hashlib.blake2b(use_cases_text.encode(), digest_size=16).digest()
+        with self._results_lock:
+            result = self._results.get(key)
+        if result is None:
+            result = self._validate(use_cases_text)
+            with self._results_lock:
+                self._results[key] = result
+        return copy.deepcopy(result)
+
+    def _validate(self, use_cases_text: str) -> Dict[str, Any]:
+        """Validate use cases meet exact requirements, without the result cache"""
         validation_result = {
             "valid": False,
             "total_count": 0,
@@ -66,16 +124,20 @@ class UseCaseValidator:
             validation_result["extracted_use_cases"] = extracted_cases
             validation_result["total_count"] = len(extracted_cases)
             
-            # Categorize use cases
-            categorized = self._categorize_use_cases(extracted_cases)
-            validation_result["category_counts"] = categorized
-            
             # Validate total count
             if validation_result["total_count"] < 15 or validation_result["total_count"] > 20:
                 validation_result["issues"].append(
                     f"Total use cases: {validation_result['total_count']}, need 15-20"
                 )
             
+            # A draft this far off is rejected on its count alone, without categorizing it
+            if not self.PLAUSIBLE_COUNT["min"] <= validation_result["total_count"] <= self.PLAUSIBLE_COUNT["max"]:
+                return validation_result
+            
+            # Categorize use cases
+            categorized = self._categorize_use_cases(extracted_cases)
+            validation_result["category_counts"] = categorized
+            
             # Validate category counts
             for category, requirements in self.REQUIRED_CATEGORIES.items():
                 count = categorized.get(category, 0)
@@ -99,14 +161,10 @@ class UseCaseValidator:
         use_cases = []
         
         # Pattern to match numbered use cases
-        patterns = [
-            r'(\d+)\.\s*\*\*([^*]+)\*\*\s*([^0-9]*?)(?=\d+\.\s*\*\*|\Z)',
-            r'(\d+)\.\s*([^\n]+)\n([^0-9]*?)(?=\d+\.|\Z)',
-            r'##\s*(\d+)\.\s*([^\n]+)\n([^#]*?)(?=##|\Z)'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.DOTALL | re.IGNORECASE)
+        for literal, pattern in USE_CASE_PATTERNS:
+            if literal not in text:
+                continue
+            matches = pattern.findall(text)
             if matches:
                 for match in matches:
                     use_case = {
@@ -121,20 +179,26 @@ class UseCaseValidator:
         if not use_cases:
             lines = text.split('\n')
             current_case = None
+            # Description lines of the current case, joined once the case is complete
+            description_lines = []
             for line in lines:
                 line = line.strip()
-                if re.match(r'^\d+\.', line):
+                numbered = NUMBERED_LINE_PATTERN.match(line)
+                if numbered:
                     if current_case:
+                        current_case["description"] = "".join(f"{part} " for part in description_lines)
                         use_cases.append(current_case)
                     current_case = {
-                        "number": re.match(r'^(\d+)\.', line).group(1),
-                        "title": re.sub(r'^\d+\.\s*', '', line),
+                        "number": numbered.group(1),
+                        "title": line[numbered.end():],
                         "description": ""
                     }
+                    description_lines = []
                 elif current_case and line:
-                    current_case["description"] += line + " "
+                    description_lines.append(line)
             
             if current_case:
+                current_case["description"] = "".join(f"{part} " for part in description_lines)
                 use_cases.append(current_case)
         
         return use_cases
@@ -144,32 +208,24 @@ class UseCaseValidator:
         category_counts = {category: 0 for category in self.REQUIRED_CATEGORIES}
         
         for use_case in use_cases:
-            full_text = (use_case["title"] + " " + use_case["description"]).lower()
-            
-            # Find best matching category
-            best_category = None
-            max_matches = 0
+            # Title-only cases skip the concatenation; no keyword ends in a space, so none needs it
+            if use_case["description"]:
+                full_text = (use_case["title"] + " " + use_case["description"]).lower()
+            else:
+                full_text = use_case["title"].lower()
             
-            for category, keywords in self.CATEGORY_KEYWORDS.items():
-                matches = sum(1 for keyword in keywords if keyword in full_text)
-                if matches > max_matches:
-                    max_matches = matches
-                    best_category = category
+            # Find best matching category: the most distinct keywords, earliest category on a tie
+            keyword_counts = Counter(self.KEYWORD_CATEGORIES[keyword] for keyword in set(self.KEYWORD_PATTERN.findall(full_text)))
             
-            if best_category and max_matches > 0:
-                category_counts[best_category] += 1
+            if keyword_counts:
+                best_category = max(self.CATEGORY_KEYWORDS, key=lambda category: keyword_counts[category])
             else:
                 # Default categorization based on common terms
-                if any(term in full_text for term in ["chatbot", "content", "generate", "language"]):
-                    category_counts["Generative AI & LLMs"] += 1
-                elif any(term in full_text for term in ["image", "visual", "vision", "detection"]):
-                    category_counts["Computer Vision"] += 1
-                elif any(term in full_text for term in ["predict", "forecast", "analytics", "model"]):
-                    category_counts["Predictive Analytics & ML"] += 1
-                elif any(term in full_text for term in ["text", "document", "sentiment"]):
-                    category_counts["Natural Language Processing"] += 1
-                else:
-                    category_counts["Automation & Optimization"] += 1
+                best_category = next(
+                    (category for category, pattern in self.FALLBACK_PATTERNS if pattern.search(full_text)),
+                    "Automation & Optimization"
+                )
+            category_counts[best_category] += 1
         
         return category_counts
 
@@ -178,26 +234,26 @@ class UseCaseValidator:
         if validation_result["valid"]:
             return ""
         
-        prompt = "CRITICAL: The generated use cases do not meet requirements. Please regenerate to fix:\n\n"
-        
-        for issue in validation_result["issues"]:
-            prompt += f"- {issue}\n"
-        
-        prompt += "\nREQUIREMENTS:\n"
-        prompt += "- Generate EXACTLY 15-20 use cases total\n"
-        prompt += "- Distribute across categories as follows:\n"
+        parts = ["CRITICAL: The generated use cases do not meet requirements. Please regenerate to fix:\n\n"]
+        parts.extend(f"- {issue}\n" for issue in validation_result["issues"])
         
-        for category, reqs in self.REQUIRED_CATEGORIES.items():
-            prompt += f"  * {category}: {reqs['min']}-{reqs['max']} use cases\n"
+        parts.append(
+            "\nREQUIREMENTS:\n"
+            "- Generate EXACTLY 15-20 use cases total\n"
+            "- Distribute across categories as follows:\n"
+        )
+        parts.extend(f"  * {category}: {reqs['min']}-{reqs['max']} use cases\n" for category, reqs in self.REQUIRED_CATEGORIES.items())
         
-        prompt += "\nEach use case MUST include:\n"
-        prompt += "- Clear title with category keywords\n"
-        prompt += "- Detailed description\n"
-        prompt += "- ROI estimate\n"
-        prompt += "- Implementation complexity\n"
-        prompt += "- Business value\n"
+        parts.append(
+            "\nEach use case MUST include:\n"
+            "- Clear title with category keywords\n"
+            "- Detailed description\n"
+            "- ROI estimate\n"
+            "- Implementation complexity\n"
+            "- Business value\n"
+        )
         
-        return prompt
+        return "".join(parts)
 
 
 class ConsolidatedReportGenerator: